@@ -1,4 +1,5 @@
 import os
+import atexit
 import asyncio
 import logging
 import threading
@@ -6,10 +7,17 @@ import time
 import json
 import uuid
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Iterator
 from google.adk.agents import Agent as OriginalAgent
 from dotenv import load_dotenv
 from .prompts import return_instructions_root
+from .routing import ModelRouter
+from .compaction import compact_tool_result, get_full_payload, payload_store
+from .transactions import TransactionPipeline
+from .sessions import ThreadLocalSession
+from .prefetch import Prefetcher
+from .metrics import StageMetrics
 from google.adk.tools import (google_search, FunctionTool, AgentTool)
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
@@ -19,17 +27,55 @@ logger = logging.getLogger(__name__)
 # Cortensor Configuration
 CORTENSOR_BASE_URL = os.getenv('CORTENSOR_BASE_URL', 'http://127.0.0.1:5010')
 CORTENSOR_API_KEY = os.getenv('CORTENSOR_API_KEY', 'default-dev-token')
+CORTENSOR_DEFAULT_MODEL = os.getenv('CORTENSOR_DEFAULT_MODEL', 'llama-3.1-8b-q4')
+CORTENSOR_FAST_MODEL = os.getenv('CORTENSOR_FAST_MODEL', CORTENSOR_DEFAULT_MODEL)
+CORTENSOR_QUALITY_MODEL = os.getenv('CORTENSOR_QUALITY_MODEL', CORTENSOR_DEFAULT_MODEL)
+
+# Ethereum MCP Configuration
+ETHEREUM_MCP_URL = os.getenv('ETHEREUM_MCP_URL', 'http://localhost:3002/api')
+ETHEREUM_MCP_HEALTH_URL = ETHEREUM_MCP_URL.rsplit('/api', 1)[0] + '/health'
+
+# Connection pool and warm-up configuration
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+WARMUP_TIMEOUT = float(os.getenv('WARMUP_TIMEOUT', '90'))
+WARMUP_PRIME_TIMEOUT = float(os.getenv('WARMUP_PRIME_TIMEOUT', '15'))
+WARMUP_NETWORKS = [n.strip() for n in os.getenv('WARMUP_NETWORKS', 'ethereum,sepolia').split(',') if n.strip()]
+KEEPALIVE_INTERVAL = float(os.getenv('KEEPALIVE_INTERVAL', '45'))
+
+# Transaction signing configuration
+EXTENDED_FUNCTIONS_ENABLED = os.getenv('ENABLE_EXTENDED_FUNCTIONS', 'false').lower() == 'true'
+TX_PIPELINE_WORKERS = int(os.getenv('TX_PIPELINE_WORKERS', '8'))
+TX_RECEIPT_TIMEOUT = float(os.getenv('TX_RECEIPT_TIMEOUT', '120'))
+
+# Speculative MCP prefetch configuration
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'true').lower() == 'true'
+PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', '4'))
+PREFETCH_TTL = float(os.getenv('PREFETCH_TTL', '30'))
+
 
 class CortensorClient:
     def __init__(self):
         self.base_url = CORTENSOR_BASE_URL
         self.api_key = CORTENSOR_API_KEY
         self.session_id = self._generate_session_id()
-        self.session = requests.Session()
-        self.session.headers.update({
+        self._sessions = ThreadLocalSession({
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {self.api_key}'
-        })
+        }, pool_size=HTTP_POOL_SIZE)
+
+    @property
+    def session(self) -> requests.Session:
+        """Session for the calling thread, backed by this process's connection pool"""
+        return self._sessions.get()
+
+    def reset_after_fork(self):
+        """Drop inherited sockets and open a separate upstream session in a forked child"""
+        self.session_id = self._generate_session_id()
+        self._sessions.reset_after_fork()
+
+    def close(self):
+        self._sessions.close()
     
     def _generate_session_id(self) -> str:
         """Generate a unique session ID"""
@@ -43,7 +89,7 @@ class CortensorClient:
         except Exception:
             return False
     
-    def completion(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+    def completion(self, prompt: str, system_prompt: str = "", model: Optional[str] = None, timeout: float = 120, **kwargs) -> str:
         """Get completion from Cortensor API according to official docs"""
         try:
             # Combine system and user prompts as per Cortensor docs
@@ -55,11 +101,13 @@ class CortensorClient:
                 "stream": False,
                 "timeout": 60
             }
+            if model:
+                payload["model"] = model
             
             response = self.session.post(
                 f"{self.base_url}/api/v1/completions/{self.session_id}",
                 json=payload,
-                timeout=120
+                timeout=timeout
             )
             
             if response.status_code == 200:
@@ -122,14 +170,26 @@ class CortensorClient:
 # Initialize Cortensor client
 cortensor_client = CortensorClient()
 
+# Per-stage latency (routing, sub-agents, tools, synthesis) for load tests and monitoring
+stage_metrics = StageMetrics()
+
+# Route cheap structured steps to the fast model and final synthesis to the quality model
+model_router = ModelRouter(
+    tiers={'fast': CORTENSOR_FAST_MODEL, 'quality': CORTENSOR_QUALITY_MODEL},
+    default_model=CORTENSOR_DEFAULT_MODEL,
+)
+CORTENSOR_MODELS = [m.strip() for m in (os.getenv('CORTENSOR_MODELS') or ','.join(model_router.tier_models())).split(',') if m.strip()]
+
 # Patch the Google ADK Agent class to support Cortensor
 class Agent(OriginalAgent):
     def __init__(self, *args, **kwargs):
+        # Cost/latency tier ('fast' or 'quality') used by the model router
+        self._model_tier = kwargs.pop('tier', None)
         # Check if model is a cortensor model
         model = kwargs.get('model', '')
         if isinstance(model, str) and model.startswith('cortensor://'):
             # Store cortensor model info and remove from kwargs for parent
-            self._cortensor_model = model
+            self._cortensor_model = model[len('cortensor://'):]
             self._use_cortensor = True
             # Pass a dummy model to parent to avoid errors
             kwargs['model'] = 'gemini-1.5-flash'  # Fallback model
@@ -140,15 +200,32 @@ class Agent(OriginalAgent):
     
     def run(self, prompt: str, **kwargs):
         """Override run method to use Cortensor when appropriate"""
+        # Optional explicit stage ('routing', 'extraction' or 'synthesis') overriding the agent tier.
+        # ADK call sites don't pass one: the root agent's single completion both routes and
+        # answers, so it stays on the quality tier and only the sub-agents run on the fast model.
+        stage = kwargs.pop('stage', None)
         if self._use_cortensor:
             try:
                 # Build system prompt with instructions
                 system_prompt = f"You are {self.name}. {self.instruction}"
                 
+                # Don't serve traffic on cold pools while startup warm-up is running
+                wait_until_ready()
+
+                model = model_router.select(self._cortensor_model, self._model_tier, stage)
+                started = time.time()
+
                 # Get completion from Cortensor using only supported parameters
                 response = cortensor_client.completion(
                     prompt=prompt,
-                    system_prompt=system_prompt
+                    system_prompt=system_prompt,
+                    model=model
+                )
+                model_router.record(model, time.time() - started, success=bool(response))
+                stage_metrics.record(
+                    stage or ('synthesis' if self._model_tier == 'quality' else 'sub_agent'),
+                    self.name,
+                    time.time() - started
                 )
                 
                 return response
@@ -162,7 +239,7 @@ class Agent(OriginalAgent):
             return super().run(prompt, **kwargs)
 
 # Cortensor model configuration
-def get_cortensor_model(model_name: str = "llama-3.1-8b-q4") -> str:
+def get_cortensor_model(model_name: str = CORTENSOR_DEFAULT_MODEL) -> str:
     """Return Cortensor model configuration for ADK agents
     
     Args:
@@ -174,30 +251,106 @@ def get_cortensor_model(model_name: str = "llama-3.1-8b-q4") -> str:
     return f"cortensor://{model_name}"
 
 
-def ethereum_mcp_call(method: str, params: dict = None) -> dict:
-    try:
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params or {},
-            "id": 1
-        }
-        response = requests.post(
-            "http://localhost:3002/api",
-            headers={"Content-Type": "application/json"},
-            json=payload,
-            timeout=30
-        )
-        if response.status_code == 200:
-            result = response.json()
-            if "result" in result:
-                return {"success": True, "data": result["result"]}
-            elif "error" in result:
-                return {"success": False, "error": result["error"]}
-        else:
-            return {"success": False, "error": f"HTTP {response.status_code}: {response.text}"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+# Per-thread sessions over a per-process connection pool for the Ethereum MCP server
+mcp_sessions = ThreadLocalSession({'Content-Type': 'application/json'}, pool_size=HTTP_POOL_SIZE)
+
+# Results of tools whose output doesn't change while the process is running; chain info
+# carries the live block number, so only static listings such as supported networks belong here
+_mcp_cache: Dict[str, dict] = {}
+_mcp_cache_lock = threading.Lock()
+
+
+def ethereum_mcp_call(method: str, params: dict = None, compact: bool = True, use_prefetch: bool = True) -> dict:
+    tool = (params or {}).get("name", method) if method == "tools/call" else method
+    started = time.perf_counter()
+    if use_prefetch and compact and method == "tools/call" and params:
+        prefetched = prefetcher.take(params.get("name", ""), params.get("arguments") or {})
+        if prefetched is not None:
+            stage_metrics.record("tool", f"{tool} (prefetched)", time.perf_counter() - started)
+            return prefetched
+    # Speculative calls are tracked apart from the ones the agent actually waits on
+    with stage_metrics.timed("tool" if use_prefetch else "prefetch", tool):
+        try:
+            payload = {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or {},
+                "id": 1
+            }
+            response = mcp_sessions.get().post(
+                ETHEREUM_MCP_URL,
+                json=payload,
+                timeout=30
+            )
+            if response.status_code == 200:
+                result = response.json()
+                if "result" in result:
+                    if compact and method == "tools/call":
+                        # Keep large payloads out of the LLM context; full result stays available by ref
+                        return {"success": True, **compact_tool_result((params or {}).get("name", ""), result["result"])}
+                    return {"success": True, "data": result["result"]}
+                elif "error" in result:
+                    return {"success": False, "error": result["error"]}
+            else:
+                return {"success": False, "error": f"HTTP {response.status_code}: {response.text}"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+
+def _prefetch_mcp_tool(name: str, arguments: dict) -> dict:
+    return ethereum_mcp_call("tools/call", {"name": name, "arguments": arguments}, use_prefetch=False)
+
+# Serves speculative results for tool calls the root agent's query made likely
+prefetcher = Prefetcher(_prefetch_mcp_tool, max_workers=PREFETCH_WORKERS, ttl=PREFETCH_TTL)
+
+# Callback state key holding the prefetch turn of the request being served
+PREFETCH_TURN_STATE_KEY = "temp:prefetch_turn"
+
+
+def begin_request(query: str) -> Optional[int]:
+    """Start speculative MCP lookups for a user request; entities come from the raw query only"""
+    if not PREFETCH_ENABLED or not query:
+        return None
+    return prefetcher.start(query)
+
+
+def end_request(turn: Optional[int]):
+    """Cancel whatever the request's prefetch turn left unclaimed, once the final response is out"""
+    if turn is not None:
+        prefetcher.finish(turn)
+
+
+def _user_query(callback_context) -> str:
+    content = getattr(callback_context, "user_content", None)
+    return " ".join(part.text for part in (getattr(content, "parts", None) or []) if getattr(part, "text", None))
+
+
+def _begin_request_callback(callback_context):
+    # Runs once per user request, before the root agent routes it to any sub-agent or tool
+    turn = begin_request(_user_query(callback_context))
+    if turn is not None:
+        callback_context.state[PREFETCH_TURN_STATE_KEY] = turn
+    return None
+
+
+def _end_request_callback(callback_context):
+    # Runs after the root agent has produced its final response for the request
+    end_request(callback_context.state.get(PREFETCH_TURN_STATE_KEY))
+    return None
+
+
+def cached_mcp_call(cache_key: str, method: str, params: dict = None) -> dict:
+    """Call the MCP server once per cache key and reuse successful results"""
+    with _mcp_cache_lock:
+        cached = _mcp_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    result = ethereum_mcp_call(method, params)
+    # Tool-level failures come back as a successful HTTP call flagged isError
+    if result.get("success") and not result.get("isError"):
+        with _mcp_cache_lock:
+            _mcp_cache[cache_key] = result
+    return result
 
 
 
@@ -274,21 +427,41 @@ def is_contract(address: str, network: str = "ethereum") -> dict:
     })
 
 def get_supported_networks() -> dict:
-    return ethereum_mcp_call("tools/call", {
+    return cached_mcp_call("supported_networks", "tools/call", {
         "name": "get_supported_networks",
         "arguments": {}
     })
 
+def get_full_tool_result(ref: str, path: str = "") -> dict:
+    """Fetch the full, uncompacted result of an earlier tool call by its ref, optionally narrowed by a dotted path (e.g. 'logs.0.data')"""
+    return get_full_payload(ref, path)
+
+def check_extended_functions_enabled() -> bool:
+    """Transactions are only signed when explicitly enabled for this deployment"""
+    return EXTENDED_FUNCTIONS_ENABLED
+
+def get_private_key_if_enabled() -> Optional[str]:
+    if not check_extended_functions_enabled():
+        return None
+    return os.getenv('WALLET_PRIVATE_KEY') or None
+
+def _call_mcp_tool(name: str, arguments: dict) -> dict:
+    return ethereum_mcp_call("tools/call", {"name": name, "arguments": arguments}, compact=False)
+
+# Pipelines nonces per (address, network) so back-to-back transactions don't collide
+tx_pipeline = TransactionPipeline(
+    _call_mcp_tool,
+    max_workers=TX_PIPELINE_WORKERS,
+    receipt_timeout=TX_RECEIPT_TIMEOUT,
+)
+
 def transfer_eth_tokens(to_address: str, amount: str, network: str = "ethereum") -> dict:
     if not check_extended_functions_enabled():
         return {"success": False, "error": "Extended functions not enabled. Private key required for transactions."}
     private_key = get_private_key_if_enabled()
     if not private_key:
         return {"success": False, "error": "No private key available for transaction signing."}
-    return ethereum_mcp_call("tools/call", {
-        "name": "transfer_native",
-        "arguments": {"to": to_address, "amount": amount, "privateKey": private_key, "network": network}
-    })
+    return tx_pipeline.submit("transfer_native", {"to": to_address, "amount": amount}, private_key, network)
 
 def transfer_erc20_tokens(to_address: str, token_address: str, amount: str, network: str = "ethereum") -> dict:
     if not check_extended_functions_enabled():
@@ -296,16 +469,36 @@ def transfer_erc20_tokens(to_address: str, token_address: str, amount: str, netw
     private_key = get_private_key_if_enabled()
     if not private_key:
         return {"success": False, "error": "No private key available for transaction signing."}
-    return ethereum_mcp_call("tools/call", {
-        "name": "transfer_erc20",
-        "arguments": {
-            "tokenAddress": token_address,
-            "to": to_address,
-            "amount": amount,
-            "privateKey": private_key,
-            "network": network
-        }
-    })
+    return tx_pipeline.submit("transfer_erc20", {
+        "tokenAddress": token_address,
+        "toAddress": to_address,
+        "amount": amount
+    }, private_key, network)
+
+def batch_transfer_eth_tokens(transfers: list, network: str = "ethereum") -> dict:
+    """Send several ETH transfers at once; transfers is a list of {"to_address": ..., "amount": ...}"""
+    if not check_extended_functions_enabled():
+        return {"success": False, "error": "Extended functions not enabled. Private key required for transactions."}
+    private_key = get_private_key_if_enabled()
+    if not private_key:
+        return {"success": False, "error": "No private key available for transaction signing."}
+    results = tx_pipeline.submit_batch([
+        ("transfer_native", {"to": t["to_address"], "amount": str(t["amount"])}) for t in transfers
+    ], private_key, network)
+    return {"success": all(r["success"] for r in results), "results": results}
+
+def batch_transfer_erc20_tokens(token_address: str, transfers: list, network: str = "ethereum") -> dict:
+    """Send one ERC20 token to several recipients; transfers is a list of {"to_address": ..., "amount": ...}"""
+    if not check_extended_functions_enabled():
+        return {"success": False, "error": "Extended functions not enabled. Private key required for transactions."}
+    private_key = get_private_key_if_enabled()
+    if not private_key:
+        return {"success": False, "error": "No private key available for transaction signing."}
+    results = tx_pipeline.submit_batch([
+        ("transfer_erc20", {"tokenAddress": token_address, "toAddress": t["to_address"], "amount": str(t["amount"])})
+        for t in transfers
+    ], private_key, network)
+    return {"success": all(r["success"] for r in results), "results": results}
 
 def approve_token_spending(spender_address: str, token_address: str, amount: str, network: str = "ethereum") -> dict:
     if not check_extended_functions_enabled():
@@ -313,16 +506,11 @@ def approve_token_spending(spender_address: str, token_address: str, amount: str
     private_key = get_private_key_if_enabled()
     if not private_key:
         return {"success": False, "error": "No private key available for transaction signing."}
-    return ethereum_mcp_call("tools/call", {
-        "name": "approve_token_spending",
-        "arguments": {
-            "tokenAddress": token_address,
-            "spender": spender_address,
-            "amount": amount,
-            "privateKey": private_key,
-            "network": network
-        }
-    })
+    return tx_pipeline.submit("approve_token_spending", {
+        "tokenAddress": token_address,
+        "spenderAddress": spender_address,
+        "amount": amount
+    }, private_key, network)
 
 def write_contract(contract_address: str, abi: list, function_name: str, args: list, network: str = "ethereum") -> dict:
     """Write data to a smart contract - requires extended functions to be enabled"""
@@ -331,17 +519,16 @@ def write_contract(contract_address: str, abi: list, function_name: str, args: l
     private_key = get_private_key_if_enabled()
     if not private_key:
         return {"success": False, "error": "No private key available for transaction signing."}
-    return ethereum_mcp_call("tools/call", {
-        "name": "write_contract",
-        "arguments": {
-            "contractAddress": contract_address,
-            "abi": abi,
-            "functionName": function_name,
-            "args": args,
-            "privateKey": private_key,
-            "network": network
-        }
-    })
+    return tx_pipeline.submit("write_contract", {
+        "contractAddress": contract_address,
+        "abi": abi,
+        "functionName": function_name,
+        "args": args
+    }, private_key, network)
+
+def wait_for_transaction_receipt(tx_hash: str, network: str = "ethereum", timeout: float = TX_RECEIPT_TIMEOUT) -> dict:
+    """Wait until a submitted transaction is mined and return its compact receipt"""
+    return tx_pipeline.wait_for_receipt(tx_hash, network, timeout).result()
 
 
 
@@ -365,8 +552,131 @@ def readme_data() -> dict:
 
 
 
+# Startup warm-up and readiness gating
+_ready = threading.Event()
+_warmup_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+_keepalive_stop = threading.Event()
+warmup_report: Dict[str, Any] = {}
+
+
+def warm_up() -> Dict[str, Any]:
+    """Open pooled connections, prime every configured model and preload static MCP data"""
+    started = time.time()
+    report: Dict[str, Any] = {"models": {}, "preloaded": {}}
+
+    # Opening these first leaves a live connection in each pool
+    report["cortensor_healthy"] = cortensor_client.health_check()
+    report["mcp_initialized"] = ethereum_mcp_call("initialize").get("success", False)
+
+    def prime(model: str) -> Dict[str, Any]:
+        model_started = time.time()
+        # A hung upstream must not hold every request at wait_until_ready for WARMUP_TIMEOUT
+        primed = bool(cortensor_client.completion(prompt="ping", model=model, timeout=WARMUP_PRIME_TIMEOUT))
+        return {"primed": primed, "latency": round(time.time() - model_started, 3)}
+
+    if CORTENSOR_MODELS:
+        with ThreadPoolExecutor(max_workers=len(CORTENSOR_MODELS), thread_name_prefix="warmup-prime") as executor:
+            report["models"] = dict(zip(CORTENSOR_MODELS, executor.map(prime, CORTENSOR_MODELS)))
+
+    report["preloaded"]["supported_networks"] = get_supported_networks().get("success", False)
+    # Not cached, but the first call per network opens the MCP server's RPC client
+    for network in WARMUP_NETWORKS:
+        report["preloaded"][f"chain_info:{network}"] = get_eth_chain_info(network).get("success", False)
+
+    report["healthy"] = (
+        report["cortensor_healthy"]
+        and report["mcp_initialized"]
+        and all(m["primed"] for m in report["models"].values())
+    )
+    report["duration"] = round(time.time() - started, 3)
+    warmup_report.clear()
+    warmup_report.update(report)
+    _ready.set()
+    logger.info(f"Warm-up finished in {report['duration']}s (healthy={report['healthy']})")
+    return report
+
+
+def _keepalive_loop():
+    """Periodically touch both upstreams so pooled connections don't go cold"""
+    while not _keepalive_stop.wait(KEEPALIVE_INTERVAL):
+        if not cortensor_client.health_check():
+            logger.warning("Cortensor keep-alive health check failed")
+        try:
+            mcp_sessions.get().get(ETHEREUM_MCP_HEALTH_URL, timeout=5)
+        except Exception as e:
+            logger.warning(f"MCP keep-alive failed: {e}")
+
+
+def _warmup_and_keepalive():
+    try:
+        warm_up()
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+        _ready.set()
+    _keepalive_loop()
+
+
+def start_warmup() -> threading.Thread:
+    """Start warm-up followed by keep-alive on a background thread (idempotent)"""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None or not _warmup_thread.is_alive():
+            _keepalive_stop.clear()
+            _warmup_thread = threading.Thread(target=_warmup_and_keepalive, name="warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def stop_keepalive():
+    _keepalive_stop.set()
+
+
+def shutdown_clients():
+    """Stop background work and close every pooled connection owned by this process"""
+    stop_keepalive()
+    tx_pipeline.shutdown(wait=False)
+    prefetcher.shutdown()
+    cortensor_client.close()
+    mcp_sessions.close()
+
+
+def _reinit_after_fork():
+    """Give a forked worker its own clients, locks and background threads"""
+    global _mcp_cache_lock, _warmup_lock, _warmup_thread, _ready, _keepalive_stop
+    _mcp_cache_lock = threading.Lock()
+    _warmup_lock = threading.Lock()
+    _warmup_thread = None
+    _ready = threading.Event()
+    _keepalive_stop = threading.Event()
+    cortensor_client.reset_after_fork()
+    mcp_sessions.reset_after_fork()
+    model_router.reset_after_fork()
+    stage_metrics.reset_after_fork()
+    payload_store.reset_after_fork()
+    tx_pipeline.reset_after_fork()
+    prefetcher.reset_after_fork()
+    # Warm the child's own pools before it serves traffic
+    if WARMUP_ENABLED:
+        start_warmup()
+
+
+def is_ready() -> bool:
+    """True once the warm-up phase has completed"""
+    return _ready.is_set()
+
+
+def wait_until_ready(timeout: float = WARMUP_TIMEOUT) -> bool:
+    """Block until warm-up completes; returns immediately when warm-up is disabled"""
+    if not WARMUP_ENABLED:
+        return True
+    return _ready.wait(timeout)
+
+
+
 rag_agent = Agent(
-    model=get_cortensor_model('llama-3.1-8b-q4'),
+    model=get_cortensor_model(CORTENSOR_FAST_MODEL),
+    tier='fast',
     name='README_Context',
     instruction=return_instructions_root('rag'),
     tools=[
@@ -374,13 +684,15 @@ rag_agent = Agent(
     ],
 )
 search_agent = Agent(
-    model=get_cortensor_model('llama-3.1-8b-q4'),
+    model=get_cortensor_model(CORTENSOR_FAST_MODEL),
+    tier='fast',
     name='Google_Search',
     instruction=return_instructions_root('search'),
     tools=[google_search],
 )
 ethereum_mcp_agent = Agent(
-    model=get_cortensor_model('llama-3.1-8b-q4'),
+    model=get_cortensor_model(CORTENSOR_FAST_MODEL),
+    tier='fast',
     name='Ethereum_MCP',
     instruction=return_instructions_root('mcp'),
     tools=[
@@ -396,22 +708,50 @@ ethereum_mcp_agent = Agent(
         FunctionTool(read_contract),
         FunctionTool(is_contract),
         FunctionTool(get_supported_networks),
+        FunctionTool(get_full_tool_result),
         FunctionTool(transfer_eth_tokens),
         FunctionTool(transfer_erc20_tokens),
+        FunctionTool(batch_transfer_eth_tokens),
+        FunctionTool(batch_transfer_erc20_tokens),
         FunctionTool(approve_token_spending),
         FunctionTool(write_contract),
+        FunctionTool(wait_for_transaction_receipt),
     ],
 )
 root_agent = Agent(
-    model=get_cortensor_model('llama-3.1-8b-q4'),
+    model=get_cortensor_model(CORTENSOR_QUALITY_MODEL),
+    tier='quality',
     name='TrendPup',
     instruction=return_instructions_root('root'),
     tools=[
     AgentTool(agent=rag_agent), 
     AgentTool(agent=search_agent), 
     AgentTool(agent=ethereum_mcp_agent),
-    ]
+    ],
+    # The prefetch turn spans the whole request, not a single completion
+    before_agent_callback=_begin_request_callback,
+    after_agent_callback=_end_request_callback,
 )
 
 
+def handle_request(query: str, **kwargs):
+    """Serve one user request through the root agent outside an ADK runner
+
+    Mirrors the root agent's callbacks: speculative lookups start from the raw
+    query before routing and are cancelled only after the final response.
+    """
+    turn = begin_request(query)
+    try:
+        return root_agent.run(query, **kwargs)
+    finally:
+        end_request(turn)
+
+atexit.register(shutdown_clients)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+if WARMUP_ENABLED:
+    start_warmup()
+
+
 app = root_agent
\ No newline at end of file
@@ -0,0 +1,193 @@
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Optional
+
+# Limits applied before MCP tool output is handed back to the LLM
+MAX_LIST_ITEMS = 5
+MAX_TEXT_LENGTH = 2000
+# Addresses (42 chars) stay intact so they can be reused in follow-up calls
+MAX_HEX_LENGTH = 42
+
+WEI_PER_ETHER = Decimal(10) ** 18
+WEI_PER_GWEI = Decimal(10) ** 9
+
+
+class PayloadStore:
+    """Bounded LRU store keeping full tool payloads retrievable by reference"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def reset_after_fork(self):
+        # Another thread may have held the lock at fork time
+        self._lock = threading.Lock()
+
+    def put(self, payload: Any) -> str:
+        ref = f"mcp:{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._items[ref] = payload
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return ref
+
+    def get(self, ref: str) -> Optional[Any]:
+        with self._lock:
+            if ref not in self._items:
+                return None
+            self._items.move_to_end(ref)
+            return self._items[ref]
+
+
+payload_store = PayloadStore()
+
+
+def shorten_hash(value: Any) -> Any:
+    """Shorten hex strings longer than an address, e.g. 0x1234abcd…9f3e"""
+    if isinstance(value, str) and value.startswith('0x') and len(value) > MAX_HEX_LENGTH:
+        return f"{value[:10]}…{value[-4:]}"
+    return value
+
+
+def wei_to_ether(value: Any) -> Any:
+    try:
+        return f"{(Decimal(str(value)) / WEI_PER_ETHER).normalize():f}"
+    except (InvalidOperation, TypeError, ValueError):
+        return value
+
+
+def wei_to_gwei(value: Any) -> Any:
+    try:
+        return f"{(Decimal(str(value)) / WEI_PER_GWEI).normalize():f}"
+    except (InvalidOperation, TypeError, ValueError):
+        return value
+
+
+def cap_list(items: list, transform: Callable[[Any], Any] = lambda item: item) -> Dict[str, Any]:
+    """Keep the first MAX_LIST_ITEMS entries along with the total count"""
+    return {
+        "count": len(items),
+        "items": [transform(item) for item in items[:MAX_LIST_ITEMS]],
+        "truncated": len(items) > MAX_LIST_ITEMS,
+    }
+
+
+def compact_value(value: Any) -> Any:
+    """Generic compaction: shorten hashes, cap lists and long strings recursively"""
+    if isinstance(value, dict):
+        return {key: compact_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return cap_list(value, compact_value) if len(value) > MAX_LIST_ITEMS else [compact_value(item) for item in value]
+    if isinstance(value, str):
+        value = shorten_hash(value)
+        if len(value) > MAX_TEXT_LENGTH:
+            return value[:MAX_TEXT_LENGTH] + f"… [{len(value) - MAX_TEXT_LENGTH} more chars]"
+    return value
+
+
+def _project(payload: dict, fields: tuple) -> dict:
+    return {field: payload[field] for field in fields if payload.get(field) is not None}
+
+
+def _compact_block(block: dict) -> dict:
+    compacted = _project(block, ('number', 'hash', 'timestamp', 'miner', 'gasUsed', 'gasLimit'))
+    # Pending blocks have no hash yet
+    if 'hash' in compacted:
+        compacted['hash'] = shorten_hash(compacted['hash'])
+    if block.get('baseFeePerGas') is not None:
+        compacted['baseFeePerGasGwei'] = wei_to_gwei(block['baseFeePerGas'])
+    transactions = block.get('transactions') or []
+    compacted['transactions'] = cap_list(
+        transactions,
+        lambda tx: shorten_hash(tx if isinstance(tx, str) else tx.get('hash'))
+    )
+    return compacted
+
+
+def _compact_transaction(tx: dict) -> dict:
+    compacted = _project(tx, ('hash', 'from', 'to', 'nonce', 'blockNumber', 'gas', 'type'))
+    if tx.get('value') is not None:
+        compacted['valueEth'] = wei_to_ether(tx['value'])
+    for field in ('gasPrice', 'maxFeePerGas', 'maxPriorityFeePerGas'):
+        if tx.get(field) is not None:
+            compacted[f'{field}Gwei'] = wei_to_gwei(tx[field])
+    tx_input = tx.get('input') or '0x'
+    if tx_input != '0x':
+        # The 4-byte selector is enough to tell which function was called
+        compacted['inputSelector'] = tx_input[:10]
+        compacted['inputBytes'] = (len(tx_input) - 2) // 2
+    return compacted
+
+
+def _compact_receipt(receipt: dict) -> dict:
+    compacted = _project(receipt, ('transactionHash', 'status', 'blockNumber', 'from', 'to', 'contractAddress', 'gasUsed'))
+    if receipt.get('effectiveGasPrice') is not None:
+        compacted['effectiveGasPriceGwei'] = wei_to_gwei(receipt['effectiveGasPrice'])
+        if receipt.get('gasUsed') is not None:
+            compacted['feeEth'] = wei_to_ether(int(receipt['gasUsed']) * int(receipt['effectiveGasPrice']))
+    compacted['logs'] = cap_list(receipt.get('logs') or [], lambda log: {
+        "address": log.get('address'),
+        "topic0": shorten_hash((log.get('topics') or [None])[0]),
+        "topics": len(log.get('topics') or []),
+    })
+    return compacted
+
+
+# Per-tool projections keyed by MCP tool name; anything else gets compact_value
+TOOL_COMPACTORS: Dict[str, Callable[[dict], dict]] = {
+    'get_block_by_number': _compact_block,
+    'get_latest_block': _compact_block,
+    'get_transaction': _compact_transaction,
+    'get_transaction_receipt': _compact_receipt,
+}
+
+
+def parse_tool_payload(result: Any) -> Any:
+    """Unwrap the MCP content envelope, decoding JSON text blocks where possible"""
+    if not isinstance(result, dict) or 'content' not in result:
+        return result
+    texts = [block.get('text', '') for block in result.get('content') or [] if block.get('type') == 'text']
+    if len(texts) != 1:
+        return texts
+    try:
+        return json.loads(texts[0])
+    except (json.JSONDecodeError, TypeError):
+        return texts[0]
+
+
+def compact_tool_result(tool_name: str, result: Any) -> Dict[str, Any]:
+    """Project a raw MCP tool result down to what the agent needs
+
+    The full result is kept in payload_store and referenced by 'ref'.
+    """
+    payload = parse_tool_payload(result)
+    compactor = TOOL_COMPACTORS.get(tool_name)
+    try:
+        if isinstance(payload, dict) and compactor:
+            compacted = compactor(payload)
+        else:
+            compacted = compact_value(payload)
+    except Exception:
+        compacted = compact_value(payload)
+    compacted_result = {"data": compacted, "ref": payload_store.put(result)}
+    if isinstance(result, dict) and result.get('isError'):
+        compacted_result["isError"] = True
+    return compacted_result
+
+
+def get_full_payload(ref: str, path: str = "") -> Dict[str, Any]:
+    """Fetch a stored payload, optionally narrowed by a dotted path such as 'logs.3.data'"""
+    result = payload_store.get(ref)
+    if result is None:
+        return {"success": False, "error": f"Unknown or expired payload reference: {ref}"}
+    value = parse_tool_payload(result)
+    for key in filter(None, path.split('.')):
+        try:
+            value = value[int(key)] if isinstance(value, list) else value[key]
+        except (KeyError, IndexError, ValueError, TypeError):
+            return {"success": False, "error": f"Path '{path}' not found in {ref}"}
+    return {"success": True, "data": value}
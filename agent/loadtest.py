@@ -0,0 +1,347 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .prefetch import extract_entities, guess_network
+from .profiler import SamplingProfiler
+
+CRYPTO_QUERY_PATTERN = re.compile(r'\b(token|coin|eth|ether|wallet|balance|swap|price|memecoin|contract|tx|transaction|gas)\b', re.IGNORECASE)
+
+
+def _fake_hash(seed: str, length: int = 64) -> str:
+    return '0x' + (uuid.uuid5(uuid.NAMESPACE_OID, seed).hex * 4)[:length]
+
+
+def canned_tool_payload(name: str, arguments: dict) -> Any:
+    """Representative MCP payloads, sized like real ones so compaction does real work"""
+    network = arguments.get("network", "ethereum")
+    if name == "get_balance":
+        return {"address": arguments.get("address"), "network": network, "wei": "1234500000000000000", "formatted": "1.2345", "symbol": "ETH"}
+    if name == "is_contract":
+        is_contract = int(arguments.get("address", "0x0")[-1], 16) % 2 == 0
+        return {"address": arguments.get("address"), "network": network, "isContract": is_contract, "type": "Contract" if is_contract else "Externally Owned Account (EOA)"}
+    if name == "get_token_info":
+        return {"address": arguments.get("tokenAddress"), "network": network, "name": "Pup Token", "symbol": "PUP", "decimals": 18, "totalSupply": "1000000000000000000000000000", "formattedTotalSupply": "1000000000"}
+    if name in ("get_latest_block", "get_block_by_number"):
+        number = arguments.get("blockNumber", 21000000)
+        return {
+            "number": str(number), "hash": _fake_hash(f"block{number}"), "parentHash": _fake_hash(f"block{number - 1}"),
+            "timestamp": "1730000000", "miner": _fake_hash("miner", 40), "gasUsed": "14999999", "gasLimit": "30000000",
+            "baseFeePerGas": "12000000000", "logsBloom": "0x" + "0" * 512,
+            "transactions": [_fake_hash(f"block{number}tx{i}") for i in range(180)],
+        }
+    if name == "get_transaction":
+        return {"hash": arguments.get("hash"), "from": _fake_hash("from", 40), "to": _fake_hash("to", 40), "value": "250000000000000000", "gas": "21000", "gasPrice": "15000000000", "nonce": 42, "blockNumber": "21000000", "input": "0x"}
+    if name == "get_transaction_receipt":
+        return {
+            "transactionHash": arguments.get("hash"), "status": "success", "blockNumber": "21000000", "from": _fake_hash("from", 40),
+            "to": _fake_hash("to", 40), "gasUsed": "51234", "effectiveGasPrice": "15000000000", "logsBloom": "0x" + "0" * 512,
+            "logs": [{"address": _fake_hash(f"log{i}", 40), "topics": [_fake_hash(f"topic{i}"), _fake_hash(f"topic{i}b")], "data": "0x" + "0" * 128} for i in range(24)],
+        }
+    if name == "get_chain_info":
+        return {"network": network, "chainId": 1 if network == "ethereum" else 11155111, "blockNumber": "21000000", "rpcUrl": "http://stand-in"}
+    if name == "get_supported_networks":
+        return {"supportedNetworks": ["ethereum", "sepolia"]}
+    if name == "estimate_gas":
+        return {"network": network, "estimatedGas": "21000"}
+    if name == "get_address_from_private_key":
+        return {"address": _fake_hash(f"signer{arguments.get('privateKey')}", 40)}
+    if name == "get_transaction_count":
+        return {"network": network, "address": arguments.get("address"), "blockTag": arguments.get("blockTag", "latest"), "transactionCount": 42}
+    if name in ("transfer_native", "transfer_erc20", "approve_token_spending"):
+        tx_hash = _fake_hash(f"{name}{json.dumps(arguments, sort_keys=True)}")
+        return {"success": True, "txHash": tx_hash, "network": network, "nonce": arguments.get("nonce"), **{k: v for k, v in arguments.items() if k not in ("privateKey", "network", "nonce")}}
+    if name == "write_contract":
+        tx_hash = _fake_hash(f"{name}{json.dumps(arguments, sort_keys=True)}")
+        return {"network": network, "transactionHash": tx_hash, "nonce": arguments.get("nonce"), "message": "Contract write transaction sent successfully"}
+    return {"network": network, "tool": name, "arguments": arguments}
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    # Keep-alive like the real servers, so connection reuse shows up in the numbers
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    jitter = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self):
+        time.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+
+    def _send_json(self, status: int, body: Any):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+
+class CortensorStandIn(_StandInHandler):
+    """Answers the status and completion endpoints CortensorClient uses"""
+
+    def do_GET(self):
+        if self.path == '/api/v1/status':
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self.path.startswith('/api/v1/completions/'):
+            self._send_json(404, {"error": "not found"})
+            return
+        request = self._read_json()
+        self._delay()
+        prompt = request.get("prompt", "")
+        self._send_json(200, {"response": f"[{request.get('model', 'default')}] stand-in answer for a {len(prompt)}-char prompt. " * 8})
+
+
+class MCPStandIn(_StandInHandler):
+    """Speaks the JSON-RPC subset of the MCP HTTP server with canned tool results"""
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {"status": "ok", "server": "MCP stand-in"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        request = self._read_json()
+        method = request.get("method")
+        self._delay()
+        if method == "initialize":
+            result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}}, "serverInfo": {"name": "MCP stand-in", "version": "1.0.0"}}
+        elif method == "tools/list":
+            result = {"tools": []}
+        elif method == "tools/call":
+            params = request.get("params") or {}
+            payload = canned_tool_payload(params.get("name", ""), params.get("arguments") or {})
+            result = {"content": [{"type": "text", "text": json.dumps(payload, indent=2)}], "isError": False}
+        else:
+            self._send_json(404, {"jsonrpc": "2.0", "error": {"code": -32601, "message": f"Method not found: {method}"}, "id": request.get("id")})
+            return
+        self._send_json(200, {"jsonrpc": "2.0", "result": result, "id": request.get("id")})
+
+
+def start_stand_in(handler: type, latency: float, jitter: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve a stand-in on an ephemeral local port; returns the server and its base URL"""
+    handler_cls = type(handler.__name__, (handler,), {"latency": latency, "jitter": jitter})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler_cls)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"stand-in-{handler.__name__}", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def load_corpus(path: str, field: Optional[str] = None) -> List[str]:
+    """Read one query per JSONL line, from `field` or the first of query/prompt/text/message/title+body"""
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                queries.append(record)
+                continue
+            if field:
+                query = record.get(field)
+            else:
+                query = next((record[key] for key in ('query', 'prompt', 'text', 'message') if record.get(key)), None)
+                if query is None and (record.get('title') or record.get('body')):
+                    query = f"{record.get('title', '')}\n\n{record.get('body', '')}".strip()
+            if query:
+                queries.append(str(query))
+    if not queries:
+        raise ValueError(f"No queries found in {path}")
+    return queries
+
+
+def completion_turn(app, query: str) -> bool:
+    """One root completion through handle_request, prefetch turn included; no sub-agent or tool stages"""
+    return bool(app.handle_request(query))
+
+
+def pipeline_turn(app, query: str) -> bool:
+    """Replay the multi-agent flow the root instructions describe
+
+    `adk api_server` runs root_agent through the ADK Runner, whose model calls
+    go to the fallback Gemini model rather than Cortensor, so that path can't
+    be driven against the stand-ins. This synthetic pipeline routes and
+    synthesizes with two root calls, consults every sub-agent and picks MCP
+    tools from the query with regexes rather than from model output.
+    """
+    turn = app.begin_request(query)
+    try:
+        app.root_agent.run(query, stage='routing')
+        context = [app.rag_agent.run(query)]
+        entities = extract_entities(query)
+        if entities["addresses"] or entities["tx_hashes"] or CRYPTO_QUERY_PATTERN.search(query):
+            context.append(app.search_agent.run(query))
+            context.append(app.ethereum_mcp_agent.run(query))
+            network = guess_network(query)
+            tool_results: List[Dict[str, Any]] = []
+            for tx_hash in entities["tx_hashes"]:
+                tool_results.append(app.get_transaction_receipt(tx_hash, network))
+            for address in entities["addresses"]:
+                contract = app.is_contract(address, network)
+                if (contract.get("data") or {}).get("isContract"):
+                    tool_results.append(app.get_eth_token_info(address, network))
+                else:
+                    tool_results.append(app.get_eth_balance(address, network))
+            if not entities["addresses"] and not entities["tx_hashes"]:
+                tool_results.append(app.get_latest_block(network))
+            context.append(json.dumps(tool_results))
+        answer = app.root_agent.run(f"{query}\n\nContext:\n" + "\n\n".join(filter(None, context)), stage='synthesis')
+        return bool(answer)
+    finally:
+        app.end_request(turn)
+
+
+TURN_MODES = {'pipeline': pipeline_turn, 'completion': completion_turn}
+
+
+def run_load(
+    app,
+    queries: List[str],
+    rate: float,
+    arrival: str = 'poisson',
+    duration: Optional[float] = None,
+    count: Optional[int] = None,
+    concurrency: int = 8,
+    seed: Optional[int] = None,
+    mode: str = 'pipeline',
+) -> Dict[str, Any]:
+    """Replay queries open-loop at `rate` arrivals/second and collect per-stage latency"""
+    rng = random.Random(seed)
+    turn = TURN_MODES[mode]
+    errors = 0
+    errors_lock = threading.Lock()
+
+    def timed_turn(query: str, arrived_at: float):
+        nonlocal errors
+        started = time.perf_counter()
+        app.stage_metrics.record('turn', 'queue_wait', started - arrived_at)
+        try:
+            ok = turn(app, query)
+        except Exception as e:
+            app.logger.error(f"Load-test turn failed: {e}")
+            ok = False
+        finished = time.perf_counter()
+        app.stage_metrics.record('turn', 'service', finished - started)
+        app.stage_metrics.record('turn', 'end_to_end', finished - arrived_at)
+        if not ok:
+            with errors_lock:
+                errors += 1
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='loadtest')
+    futures = []
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+    next_arrival = started
+    sent = 0
+    while (count is None or sent < count) and (deadline is None or next_arrival < deadline):
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        futures.append(executor.submit(timed_turn, queries[sent % len(queries)], next_arrival))
+        sent += 1
+        next_arrival += rng.expovariate(rate) if arrival == 'poisson' else 1.0 / rate
+    wait(futures)
+    executor.shutdown()
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "requests": sent,
+        "errors": errors,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(sent / elapsed, 3) if elapsed else 0.0,
+        "offered_rate": rate,
+        "stages": app.stage_metrics.snapshot(),
+        "models": app.model_router.stats(),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay a recorded query corpus against root_agent and report per-stage latency")
+    parser.add_argument('--corpus', required=True, help="JSONL file with one query per line")
+    parser.add_argument('--field', help="JSON field holding the query (default: query/prompt/text/message, then title+body)")
+    parser.add_argument('--rate', type=float, default=1.0, help="Arrivals per second")
+    parser.add_argument('--arrival', choices=['poisson', 'uniform'], default='poisson', help="Inter-arrival distribution")
+    parser.add_argument('--duration', type=float, help="Stop sending after this many seconds")
+    parser.add_argument('--count', type=int, help="Stop after this many queries (default: one pass over the corpus)")
+    parser.add_argument('--mode', choices=sorted(TURN_MODES), default='pipeline',
+                        help="'pipeline' replays a synthetic routing/sub-agent/tool/synthesis flow; 'completion' sends each query as one root completion via handle_request")
+    parser.add_argument('--concurrency', type=int, default=8, help="Turns served in parallel")
+    parser.add_argument('--seed', type=int, help="Seed for arrival times")
+    parser.add_argument('--live', action='store_true', help="Use the configured Cortensor/MCP endpoints instead of local stand-ins")
+    parser.add_argument('--llm-latency', type=float, default=0.4, help="Stand-in Cortensor latency in seconds")
+    parser.add_argument('--mcp-latency', type=float, default=0.05, help="Stand-in MCP latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Uniform +/- jitter added to stand-in latencies")
+    parser.add_argument('--profile', metavar='SVG', help="Sample Python stacks and write a flame graph (plus a .folded file)")
+    parser.add_argument('--profile-interval', type=float, default=0.005, help="Seconds between profiler samples")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    queries = load_corpus(args.corpus, args.field)
+    if args.count is None and args.duration is None:
+        args.count = len(queries)
+
+    stand_ins = []
+    if not args.live:
+        # Must be in place before the agent module reads its configuration at import
+        cortensor, cortensor_url = start_stand_in(CortensorStandIn, args.llm_latency, args.jitter)
+        mcp, mcp_url = start_stand_in(MCPStandIn, args.mcp_latency, args.jitter)
+        os.environ['CORTENSOR_BASE_URL'] = cortensor_url
+        os.environ['ETHEREUM_MCP_URL'] = f"{mcp_url}/api"
+        stand_ins = [cortensor, mcp]
+
+    app = importlib.import_module('.agent', __package__)
+    app.wait_until_ready()
+    app.stage_metrics.reset()
+
+    profiler = None
+    if args.profile:
+        # Stand-in servers and the arrival loop share the process but aren't part of the agent's CPU cost
+        profiler = SamplingProfiler(args.profile_interval, exclude_functions=('process_request_thread', 'serve_forever', 'run_load'))
+        profiler.start()
+    try:
+        report = run_load(app, queries, args.rate, args.arrival, args.duration, args.count, args.concurrency, args.seed, args.mode)
+    finally:
+        if profiler:
+            profiler.stop()
+        for server in stand_ins:
+            server.shutdown()
+
+    report["warmup"] = dict(app.warmup_report)
+    report["stand_ins"] = not args.live
+    if profiler:
+        folded_path = os.path.splitext(args.profile)[0] + '.folded'
+        profiler.write_folded(folded_path)
+        profiler.write_flamegraph(args.profile)
+        report["profile"] = {"samples": profiler.samples, "flamegraph": args.profile, "folded": folded_path}
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Tuple
+
+
+class StageMetrics:
+    """Latency samples per (stage, name), e.g. ('tool', 'get_balance') or ('synthesis', 'TrendPup')"""
+
+    def __init__(self, window: int = 2000):
+        self._window = window
+        self.reset_after_fork()
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def record(self, stage: str, name: str, seconds: float):
+        key = (stage, name)
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self._window)).append(seconds)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    @contextmanager
+    def timed(self, stage: str, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, name, time.perf_counter() - started)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Count and p50/p95/max/avg latency per stage and name"""
+        with self._lock:
+            items = [(key, sorted(samples), self._counts[key]) for key, samples in self._samples.items()]
+        report: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (stage, name), ordered, count in items:
+            report.setdefault(stage, {})[name] = {
+                "count": count,
+                "avg": round(sum(ordered) / len(ordered), 4),
+                "p50": round(ordered[len(ordered) // 2], 4),
+                "p95": round(ordered[int(0.95 * (len(ordered) - 1))], 4),
+                "max": round(ordered[-1], 4),
+            }
+        return report
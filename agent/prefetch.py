@@ -0,0 +1,165 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A tx hash is 32 bytes, an address 20; the lookarounds stop a hash from also matching as an address
+TX_HASH_PATTERN = re.compile(r'(?<![0-9a-fA-Fx])0x[0-9a-fA-F]{64}(?![0-9a-fA-F])')
+ADDRESS_PATTERN = re.compile(r'(?<![0-9a-fA-Fx])0x[0-9a-fA-F]{40}(?![0-9a-fA-F])')
+
+# fetch(tool_name, arguments) -> the same dict ethereum_mcp_call returns
+ToolFetcher = Callable[[str, dict], dict]
+
+
+def extract_entities(text: str) -> Dict[str, List[str]]:
+    """Pull wallet/contract addresses and transaction hashes out of a user query"""
+    return {
+        "tx_hashes": list(dict.fromkeys(TX_HASH_PATTERN.findall(text))),
+        "addresses": list(dict.fromkeys(ADDRESS_PATTERN.findall(text))),
+    }
+
+
+def guess_network(text: str) -> str:
+    """Mirror the MCP agent's rule: mainnet only when asked for, otherwise Sepolia"""
+    return "ethereum" if re.search(r'\bmain\s?net\b', text, re.IGNORECASE) else "sepolia"
+
+
+def prefetch_key(tool: str, arguments: dict) -> Tuple[str, str]:
+    return tool, json.dumps(arguments, sort_keys=True)
+
+
+class Prefetcher:
+    """Start likely MCP lookups while the LLM is still routing the turn
+
+    Results are keyed by (tool name, arguments) and shared by every turn that
+    asked for them; each owning turn can claim a result once. An entry is
+    cancelled when the last turn owning it finishes or when it expires.
+    """
+
+    def __init__(self, fetch: ToolFetcher, max_workers: int = 4, ttl: float = 30.0):
+        self._fetch = fetch
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.reset_after_fork()
+
+    def reset_after_fork(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prefetch")
+        # key -> {"future", "expires_at", "owners": turns that asked for it, "claims": hand-outs left}
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._turns = 0
+        # turn id -> deadline after which a turn whose finish() never ran is dropped
+        self._active: Dict[int, float] = {}
+
+    def _discard(self, key: Tuple[str, str]):
+        # Callers hold self._lock
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry["future"].cancel()
+
+    def _release_turn(self, turn: int):
+        # Callers hold self._lock
+        self._active.pop(turn, None)
+        for key, entry in list(self._entries.items()):
+            if turn in entry["owners"]:
+                entry["owners"].discard(turn)
+                entry["claims"] = min(entry["claims"], len(entry["owners"]))
+                if not entry["owners"]:
+                    self._discard(key)
+
+    def _schedule(self, turn: int, tool: str, arguments: dict) -> Optional[Future]:
+        key = prefetch_key(tool, arguments)
+        now = time.monotonic()
+        with self._lock:
+            # Follow-ups run from done callbacks, possibly after their turn finished
+            if turn not in self._active:
+                return None
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] < now:
+                self._discard(key)
+                entry = None
+            if entry is None:
+                entry = {
+                    "future": self._executor.submit(self._fetch, tool, arguments),
+                    "expires_at": now + self.ttl,
+                    "owners": set(),
+                    "claims": 0,
+                }
+                self._entries[key] = entry
+            if turn not in entry["owners"]:
+                entry["owners"].add(turn)
+                entry["claims"] += 1
+            return entry["future"]
+
+    def _prefetch_address(self, turn: int, address: str, network: str):
+        # Token info for contracts, balance for wallets; both are what the MCP agent asks next
+        future = self._schedule(turn, "is_contract", {"address": address, "network": network})
+        if future is None:
+            return
+
+        def follow_up(done: Future):
+            if done.cancelled():
+                return
+            try:
+                result = done.result()
+                payload = result.get("data") if result.get("success") else None
+            except Exception:
+                payload = None
+            if isinstance(payload, dict) and payload.get("isContract"):
+                self._schedule(turn, "get_token_info", {"tokenAddress": address, "network": network})
+            else:
+                self._schedule(turn, "get_balance", {"address": address, "network": network})
+
+        future.add_done_callback(follow_up)
+
+    def start(self, text: str) -> int:
+        """Kick off speculative lookups for a new query and return its turn id"""
+        now = time.monotonic()
+        with self._lock:
+            # A request that raised before finish() can't hold entries past their TTL
+            for stale in [turn for turn, deadline in self._active.items() if deadline < now]:
+                self._release_turn(stale)
+            self._turns += 1
+            turn = self._turns
+            self._active[turn] = now + self.ttl
+        entities = extract_entities(text)
+        network = guess_network(text)
+        for tx_hash in entities["tx_hashes"]:
+            self._schedule(turn, "get_transaction_receipt", {"hash": tx_hash, "network": network})
+        for address in entities["addresses"]:
+            self._prefetch_address(turn, address, network)
+        return turn
+
+    def take(self, tool: str, arguments: dict) -> Optional[dict]:
+        """Claim a prefetched result, waiting for it if it's still in flight"""
+        key = prefetch_key(tool, arguments)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry["claims"] -= 1
+            if entry["claims"] <= 0 or time.monotonic() > entry["expires_at"]:
+                self._entries.pop(key)
+        future, expires_at = entry["future"], entry["expires_at"]
+        if time.monotonic() > expires_at:
+            future.cancel()
+            return None
+        try:
+            result = future.result(timeout=max(expires_at - time.monotonic(), 0))
+        except Exception:
+            return None
+        # Failed speculative calls are retried for real rather than served
+        return result if result.get("success") else None
+
+    def finish(self, turn: int):
+        """Drop the turn's claim on what it started, cancelling entries no other turn owns, and expire stale ones"""
+        now = time.monotonic()
+        with self._lock:
+            self._release_turn(turn)
+            for key in [key for key, entry in self._entries.items() if entry["expires_at"] < now]:
+                self._discard(key)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,119 @@
+import os
+import sys
+import threading
+from collections import Counter
+from html import escape
+from typing import Dict, Optional
+
+# The sampler's own thread would otherwise show up in every sample
+IGNORED_THREADS = ('sampling-profiler',)
+# Leaf frames of threads blocked on locks, queues or sockets rather than burning CPU
+IDLE_LEAVES = ('wait', 'select', 'poll', 'accept', 'readinto', 'recv_into', '_wait_for_tstate_lock', '_worker')
+
+
+class SamplingProfiler:
+    """Periodically sample every thread's Python stack into folded-stack counts
+
+    Output uses the collapsed format understood by flamegraph.pl and
+    speedscope, and write_flamegraph renders a self-contained SVG. Idle
+    stacks are dropped unless include_idle is set, and any stack passing
+    through a function named in exclude_functions is skipped.
+    """
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False, exclude_functions: tuple = ()):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.exclude_functions = set(exclude_functions)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _label(code) -> str:
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own or names.get(ident, '').startswith(IGNORED_THREADS):
+                continue
+            if not self.include_idle and frame.f_code.co_name in IDLE_LEAVES:
+                continue
+            stack = []
+            excluded = False
+            while frame is not None:
+                if frame.f_code.co_name in self.exclude_functions:
+                    excluded = True
+                    break
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if not excluded:
+                self.stacks[';'.join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_folded(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def write_flamegraph(self, path: str, width: int = 1200, row_height: int = 16, title: str = "TrendPup agent CPU profile"):
+        """Render the collected stacks as a static flame graph SVG"""
+        root: Dict = {"count": 0, "children": {}}
+        for stack, count in self.stacks.items():
+            node = root
+            node["count"] += count
+            for frame in stack.split(';'):
+                node = node["children"].setdefault(frame, {"count": 0, "children": {}})
+                node["count"] += count
+
+        rects = []
+        max_depth = 0
+
+        def layout(node: Dict, x: float, depth: int):
+            nonlocal max_depth
+            for name, child in sorted(node["children"].items()):
+                child_width = width * child["count"] / root["count"]
+                if child_width >= 0.5:
+                    max_depth = max(max_depth, depth)
+                    rects.append((name, x, depth, child_width, child["count"]))
+                    layout(child, x, depth + 1)
+                x += child_width
+
+        if root["count"]:
+            layout(root, 0.0, 0)
+        height = (max_depth + 2) * row_height + 24
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace" font-size="11">',
+            f'<text x="4" y="14">{escape(title)} ({self.samples} samples)</text>',
+        ]
+        for name, x, depth, rect_width, count in rects:
+            # Flame graphs grow upwards from the bottom row
+            y = height - (depth + 1) * row_height
+            hue = 20 + (hash(name) % 40)
+            share = 100.0 * count / root["count"]
+            label = name if rect_width > 7 * len(name) else name[:max(int(rect_width / 7) - 2, 0)] + '..'
+            parts.append(
+                f'<g><title>{escape(name)}: {count} samples ({share:.1f}%)</title>'
+                f'<rect x="{x:.1f}" y="{y}" width="{rect_width:.1f}" height="{row_height - 1}" fill="hsl({hue},85%,60%)"/>'
+                + (f'<text x="{x + 2:.1f}" y="{y + row_height - 4}">{escape(label)}</text>' if rect_width > 21 else '')
+                + '</g>'
+            )
+        parts.append('</svg>')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(parts))
@@ -115,6 +115,8 @@ def return_instructions_root(agent_type: str = 'root') -> str:
         - transfer_eth_tokens: Transfer native ETH to another address
         - transfer_erc20_tokens: Transfer ERC20 tokens
         - approve_token_spending: Approve token spending for DeFi protocols
+        - batch_transfer_eth_tokens / batch_transfer_erc20_tokens: Send several transfers in one call (payouts)
+        - wait_for_transaction_receipt: Wait for a submitted transaction to be mined and get its status
         
         **Contract Operations:**
         - read_contract: Read data from smart contracts
@@ -122,6 +124,10 @@ def return_instructions_root(agent_type: str = 'root') -> str:
         - is_contract: Check if an address is a smart contract
         - get_eth_token_info: Get ERC20 token information (name, symbol, decimals, supply)
 
+        **Compacted Results:**
+        - Tool results are compacted: long hashes are shortened, wei values are converted to ETH/gwei and long lists show only the first items plus a count
+        - get_full_tool_result: Fetch the full payload using the "ref" returned with a result, optionally narrowed by a path (e.g. get_full_tool_result(ref, "logs.2"))
+
         **CRITICAL TOKEN OPERATIONS WORKFLOW:**
         When users ask about specific tokens (like USDT, USDC, UNI, etc.):
         1. **You need the token's contract address** to check balances or get token info
@@ -0,0 +1,80 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Any
+
+# Which tier serves each step of a turn when a caller names the stage explicitly.
+# Without one the agent's declared tier applies, so the root agent (routing and
+# final answer in one completion) runs on the quality model.
+STAGE_TIERS = {
+    'routing': 'fast',
+    'extraction': 'fast',
+    'synthesis': 'quality',
+}
+
+
+class ModelRouter:
+    """Pick a Cortensor model per request and keep per-model latency stats"""
+
+    def __init__(self, tiers: Dict[str, str], default_model: str, window: int = 200):
+        self.tiers = dict(tiers)
+        self.default_model = default_model
+        self._window = window
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def reset_after_fork(self):
+        """Start fresh stats with a new lock in a forked child"""
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def model_for(self, tier: Optional[str]) -> str:
+        """Return the model configured for a tier, or the default model"""
+        return self.tiers.get(tier, self.default_model) if tier else self.default_model
+
+    def select(self, pinned_model: Optional[str] = None, tier: Optional[str] = None, stage: Optional[str] = None) -> str:
+        """Choose the model for one request
+
+        An explicit stage wins over the agent's declared tier, which wins over
+        the model the agent was constructed with.
+        """
+        if stage in STAGE_TIERS:
+            return self.model_for(STAGE_TIERS[stage])
+        if tier in self.tiers:
+            return self.tiers[tier]
+        return pinned_model or self.default_model
+
+    def tier_models(self) -> list:
+        """Distinct models configured for a tier; tiered agents never fall back to the default"""
+        return list(dict.fromkeys(self.tiers.values()))
+
+    def record(self, model: str, latency: float, success: bool = True):
+        with self._lock:
+            entry = self._stats.setdefault(model, {
+                "requests": 0,
+                "errors": 0,
+                "total_latency": 0.0,
+                "max_latency": 0.0,
+                "samples": deque(maxlen=self._window),
+            })
+            entry["requests"] += 1
+            if not success:
+                entry["errors"] += 1
+            entry["total_latency"] += latency
+            entry["max_latency"] = max(entry["max_latency"], latency)
+            entry["samples"].append(latency)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of request count, error count and latency figures per model"""
+        with self._lock:
+            snapshot = {}
+            for model, entry in self._stats.items():
+                samples: Deque[float] = entry["samples"]
+                ordered = sorted(samples)
+                snapshot[model] = {
+                    "requests": entry["requests"],
+                    "errors": entry["errors"],
+                    "avg_latency": round(entry["total_latency"] / entry["requests"], 3),
+                    "p95_latency": round(ordered[int(0.95 * (len(ordered) - 1))], 3) if ordered else 0.0,
+                    "max_latency": round(entry["max_latency"], 3),
+                }
+            return snapshot
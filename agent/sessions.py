@@ -0,0 +1,51 @@
+import os
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ThreadLocalSession:
+    """Give each thread its own requests session on top of one per-process pool
+
+    requests.Session isn't safe to share between threads, but the urllib3
+    pool behind an HTTPAdapter is, so threads share warm connections while
+    keeping session state separate. Sockets inherited across fork() are
+    never reused: a new pool is built as soon as a new process id is seen
+    and the inherited one is left for the parent.
+    """
+
+    def __init__(self, headers: Dict[str, str], pool_size: int = 10):
+        self.headers = dict(headers)
+        self.pool_size = pool_size
+        self.reset_after_fork()
+
+    def reset_after_fork(self):
+        self._pid = os.getpid()
+        self._adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self._local = threading.local()
+
+    def get(self) -> requests.Session:
+        if self._pid != os.getpid():
+            self.reset_after_fork()
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    def close(self):
+        """Close every pooled connection of this process
+
+        Sessions own no connections besides the shared adapter's, so they're
+        not tracked; each is dropped with its thread or on the next get().
+        """
+        if self._pid != os.getpid():
+            self.reset_after_fork()
+            return
+        self._local = threading.local()
+        self._adapter.close()
@@ -0,0 +1,274 @@
+import hashlib
+import heapq
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .compaction import TOOL_COMPACTORS, parse_tool_payload
+
+# call_tool(name, arguments) -> {"success": bool, "data": <raw MCP result>} or {"success": False, "error": ...}
+ToolCaller = Callable[[str, dict], dict]
+
+# Node errors meaning the nonce was consumed even though our call failed
+NONCE_CONSUMED_ERRORS = ('nonce too low', 'already known', 'replacement transaction underpriced')
+
+# ERC20 tools whose calldata is simple enough to encode here: tool -> (selector, address argument)
+ERC20_CALLS = {
+    "transfer_erc20": ("a9059cbb", "toAddress"),
+    "approve_token_spending": ("095ea7b3", "spenderAddress"),
+}
+HEX_ADDRESS_PATTERN = re.compile(r'^0x[0-9a-fA-F]{40}$')
+
+
+def encode_erc20_call(selector: str, address: str, raw_amount: int) -> str:
+    """ABI-encode an (address, uint256) ERC20 call such as transfer or approve"""
+    return "0x" + selector + address[2:].lower().rjust(64, "0") + format(raw_amount, "x").rjust(64, "0")
+
+
+class NonceTracker:
+    """Hand out sequential nonces per (address, network) without waiting for receipts
+
+    The first reservation for a key reads the pending transaction count from
+    the chain; later ones are served locally. Nonces of transactions that were
+    never broadcast are released and reused first so no gap is left behind.
+    """
+
+    def __init__(self, fetch_nonce: Callable[[str, str], int]):
+        self._fetch_nonce = fetch_nonce
+        self._next: Dict[Tuple[str, str], int] = {}
+        self._released: Dict[Tuple[str, str], List[int]] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def reserve(self, address: str, network: str) -> int:
+        key = (address.lower(), network)
+        with self._lock_for(key):
+            released = self._released.get(key)
+            if released:
+                return heapq.heappop(released)
+            if key not in self._next:
+                self._next[key] = self._fetch_nonce(address, network)
+            nonce = self._next[key]
+            self._next[key] = nonce + 1
+            return nonce
+
+    def release(self, address: str, network: str, nonce: int):
+        """Return a nonce whose transaction never reached the node"""
+        key = (address.lower(), network)
+        with self._lock_for(key):
+            if key in self._next:
+                heapq.heappush(self._released.setdefault(key, []), nonce)
+
+    def lowest_released(self, address: str, network: str) -> Optional[int]:
+        """The lowest nonce handed back but not yet reused, i.e. a gap later transactions queue behind"""
+        key = (address.lower(), network)
+        with self._lock_for(key):
+            released = self._released.get(key)
+            return released[0] if released else None
+
+    def resync(self, address: str, network: str):
+        """Forget local state so the next reservation re-reads the chain"""
+        key = (address.lower(), network)
+        with self._lock_for(key):
+            self._next.pop(key, None)
+            self._released.pop(key, None)
+
+
+class TransactionPipeline:
+    """Submit signed MCP transactions concurrently with locally pipelined nonces
+
+    Gas estimates for a batch run concurrently, from the sender, before any
+    nonce is reserved, and each goes out as its transaction's gas limit.
+    Sends then go out one at a time in nonce order without waiting for
+    receipts, so a send that fails releases its nonce to the next transaction
+    instead of stranding it behind a gap. Receipts are polled on a separate
+    pool with exponential backoff, so waiting on them never delays a send.
+    """
+
+    def __init__(
+        self,
+        call_tool: ToolCaller,
+        max_workers: int = 8,
+        receipt_timeout: float = 120.0,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 8.0,
+    ):
+        self._call_tool = call_tool
+        self.max_workers = max_workers
+        self.receipt_timeout = receipt_timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.reset_after_fork()
+
+    def reset_after_fork(self):
+        """Rebuild worker threads and locks; a forked child inherits neither safely"""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tx-pipeline")
+        # Polls mostly sleep for up to receipt_timeout; on their own pool they never hold up an estimate
+        self._receipts = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tx-receipts")
+        # Parent and child may both sign from the same account, so re-read nonces from the chain
+        self.nonces = NonceTracker(self._fetch_pending_nonce)
+        self._senders: Dict[str, str] = {}
+        self._senders_lock = threading.Lock()
+        self._decimals: Dict[Tuple[str, str], int] = {}
+        self._decimals_lock = threading.Lock()
+
+    def _call(self, name: str, arguments: dict) -> Tuple[bool, Any]:
+        result = self._call_tool(name, arguments)
+        if not result.get("success"):
+            return False, result.get("error")
+        raw = result.get("data")
+        payload = parse_tool_payload(raw)
+        if isinstance(raw, dict) and raw.get("isError"):
+            return False, payload
+        return True, payload
+
+    def _fetch_pending_nonce(self, address: str, network: str) -> int:
+        ok, payload = self._call("get_transaction_count", {"address": address, "blockTag": "pending", "network": network})
+        if not ok:
+            raise RuntimeError(f"Could not read nonce for {address} on {network}: {payload}")
+        return int(payload["transactionCount"])
+
+    def sender_address(self, private_key: str) -> str:
+        """Resolve (and cache) the account address for a signing key"""
+        key_id = hashlib.sha256(private_key.encode()).hexdigest()
+        with self._senders_lock:
+            if key_id in self._senders:
+                return self._senders[key_id]
+        ok, payload = self._call("get_address_from_private_key", {"privateKey": private_key})
+        if not ok:
+            raise RuntimeError(f"Could not derive sender address: {payload}")
+        with self._senders_lock:
+            self._senders[key_id] = payload["address"]
+        return payload["address"]
+
+    def _token_decimals(self, token: str, network: str) -> int:
+        key = (token.lower(), network)
+        with self._decimals_lock:
+            if key in self._decimals:
+                return self._decimals[key]
+        ok, payload = self._call("get_token_info", {"tokenAddress": token, "network": network})
+        if not ok:
+            raise RuntimeError(f"Could not read decimals of {token}: {payload}")
+        with self._decimals_lock:
+            self._decimals[key] = int(payload["decimals"])
+        return self._decimals[key]
+
+    def _estimate(self, tool: str, arguments: dict, network: str, sender: str) -> Tuple[bool, Any]:
+        """Estimate gas as the sender, so a transfer it can't afford or that would revert fails here"""
+        params = {"from": sender, "network": network}
+        if tool == "transfer_native":
+            params.update(to=arguments["to"], value=arguments["amount"])
+        elif tool in ERC20_CALLS:
+            selector, recipient_field = ERC20_CALLS[tool]
+            recipient = arguments[recipient_field]
+            if not HEX_ADDRESS_PATTERN.match(recipient):
+                return True, None
+            try:
+                decimals = self._token_decimals(arguments["tokenAddress"], network)
+            except Exception as e:
+                return False, str(e)
+            raw_amount = int(Decimal(str(arguments["amount"])).scaleb(decimals))
+            params.update(to=arguments["tokenAddress"], data=encode_erc20_call(selector, recipient, raw_amount))
+        else:
+            # write_contract calldata is ABI-encoded by the server, which estimates it while sending
+            return True, None
+        # ENS names are only resolved by the send itself
+        if not HEX_ADDRESS_PATTERN.match(params["to"]):
+            return True, None
+        ok, payload = self._call("estimate_gas", params)
+        return ok, payload.get("estimatedGas") if ok and isinstance(payload, dict) else payload
+
+    def _send(self, tool: str, arguments: dict, private_key: str, network: str, sender: str, nonce: int) -> Dict[str, Any]:
+        try:
+            ok, payload = self._call(tool, {**arguments, "privateKey": private_key, "network": network, "nonce": nonce})
+        except Exception as e:
+            ok, payload = False, str(e)
+        if not ok:
+            if any(marker in str(payload).lower() for marker in NONCE_CONSUMED_ERRORS):
+                self.nonces.resync(sender, network)
+            else:
+                self.nonces.release(sender, network, nonce)
+            return {"success": False, "error": payload, "nonce": nonce}
+        tx_hash = payload.get("txHash") or payload.get("transactionHash")
+        return {"success": True, "status": "pending", "txHash": tx_hash, "nonce": nonce, "data": payload}
+
+    def submit_batch(
+        self,
+        transactions: List[Tuple[str, dict]],
+        private_key: str,
+        network: str = "ethereum",
+        wait_for_receipts: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Submit (tool_name, arguments) pairs from one account; results keep input order"""
+        try:
+            sender = self.sender_address(private_key)
+        except Exception as e:
+            return [{"success": False, "error": str(e)} for _ in transactions]
+
+        estimates = [self._executor.submit(self._estimate, tool, arguments, network, sender) for tool, arguments in transactions]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(transactions)
+        for index, ((tool, arguments), estimate) in enumerate(zip(transactions, estimates)):
+            ok, gas = estimate.result()
+            if not ok:
+                results[index] = {"success": False, "error": f"Gas estimation failed: {gas}"}
+                continue
+            try:
+                nonce = self.nonces.reserve(sender, network)
+            except Exception as e:
+                results[index] = {"success": False, "error": str(e)}
+                continue
+            # A failed send releases its nonce before the next reservation, re-noncing the rest of the batch
+            # The estimate is the gas limit, so the node isn't asked to estimate again during the send
+            results[index] = self._send(tool, {**arguments, "gas": gas} if gas is not None else arguments, private_key, network, sender, nonce)
+            if gas is not None:
+                results[index]["estimatedGas"] = gas
+
+        # Another batch from the same account may still have left a nonce unused below ours
+        gap = self.nonces.lowest_released(sender, network)
+        receipts: Dict[int, Future] = {}
+        for index, result in enumerate(results):
+            if not result.get("success"):
+                continue
+            if gap is not None and result["nonce"] > gap:
+                result.update({
+                    "success": False,
+                    "status": "blocked",
+                    "blockedByNonce": gap,
+                    "error": f"Broadcast, but stays pending until nonce {gap} is used by another transaction",
+                })
+            elif wait_for_receipts:
+                receipts[index] = self.wait_for_receipt(result["txHash"], network)
+        for index, future in receipts.items():
+            results[index]["receipt"] = future.result()
+        return results
+
+    def submit(self, tool: str, arguments: dict, private_key: str, network: str = "ethereum", wait_for_receipt: bool = False) -> Dict[str, Any]:
+        return self.submit_batch([(tool, arguments)], private_key, network, wait_for_receipt)[0]
+
+    def _poll_receipt(self, tx_hash: str, network: str, timeout: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        delay = self.poll_interval
+        while True:
+            ok, payload = self._call("get_transaction_receipt", {"hash": tx_hash, "network": network})
+            if ok and isinstance(payload, dict):
+                return {"success": True, **TOOL_COMPACTORS["get_transaction_receipt"](payload)}
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return {"success": False, "error": f"Timed out waiting for receipt of {tx_hash}", "lastError": payload}
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def wait_for_receipt(self, tx_hash: str, network: str = "ethereum", timeout: Optional[float] = None) -> Future:
+        """Poll for a receipt in the background; the future resolves to a compact receipt"""
+        return self._receipts.submit(self._poll_receipt, tx_hash, network, timeout or self.receipt_timeout)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+        self._receipts.shutdown(wait=wait)
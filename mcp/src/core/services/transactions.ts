@@ -18,9 +18,13 @@ export async function getTransactionReceipt(hash: Hash, network = getCurrentNetw
 
 
 
-export async function getTransactionCount(address: Address, network = getCurrentNetwork().name): Promise<number> {
+export async function getTransactionCount(
+  address: Address,
+  network = getCurrentNetwork().name,
+  blockTag: 'latest' | 'pending' = 'latest'
+): Promise<number> {
   const client = getPublicClient(network);
-  const count = await client.getTransactionCount({ address });
+  const count = await client.getTransactionCount({ address, blockTag });
   return Number(count);
 }
 
@@ -49,6 +49,8 @@ const erc20TransferAbi = [
  * @param toAddressOrEns
  * @param amount
  * @param network
+ * @param nonce
+ * @param gas
  * @returns
  */
 
@@ -58,7 +60,9 @@ export async function transferNative(
   privateKey: string | Hex,
   toAddressOrEns: string,
   amount: string,
-  network = getCurrentNetwork().name
+  network = getCurrentNetwork().name,
+  nonce?: number,
+  gas?: bigint
 ): Promise<Hash> {
   const toAddress = await resolveAddress(toAddressOrEns, network);
   const formattedKey = typeof privateKey === 'string' && !privateKey.startsWith('0x')
@@ -73,7 +77,9 @@ export async function transferNative(
     to: toAddress,
     value: amountWei,
     account: client.account,
-    chain: client.chain
+    chain: client.chain,
+    nonce,
+    gas
   });
 }
 
@@ -85,6 +91,8 @@ export async function transferNative(
  * @param amount
  * @param privateKey
  * @param network
+ * @param nonce
+ * @param gas
  * @returns
  */
 
@@ -95,7 +103,9 @@ export async function transferERC20(
   toAddressOrEns: string,
   amount: string,
   privateKey: string | `0x${string}`,
-  network: string = getCurrentNetwork().name
+  network: string = getCurrentNetwork().name,
+  nonce?: number,
+  gas?: bigint
 ): Promise<{
   txHash: Hash;
   amount: {
@@ -136,7 +146,9 @@ export async function transferERC20(
     functionName: 'transfer',
     args: [toAddress, rawAmount],
     account: walletClient.account,
-    chain: walletClient.chain
+    chain: walletClient.chain,
+    nonce,
+    gas
   });
   return {
     txHash: hash,
@@ -159,6 +171,8 @@ export async function transferERC20(
  * @param amount
  * @param privateKey
  * @param network
+ * @param nonce
+ * @param gas
  * @returns
  */
 
@@ -169,7 +183,9 @@ export async function approveERC20(
   spenderAddressOrEns: string,
   amount: string,
   privateKey: string | `0x${string}`,
-  network: string = getCurrentNetwork().name
+  network: string = getCurrentNetwork().name,
+  nonce?: number,
+  gas?: bigint
 ): Promise<{
   txHash: Hash;
   amount: {
@@ -207,7 +223,9 @@ export async function approveERC20(
     functionName: 'approve',
     args: [spenderAddress, rawAmount],
     account: walletClient.account!,
-    chain: walletClient.chain
+    chain: walletClient.chain,
+    nonce,
+    gas
   });
   return {
     txHash: hash,
@@ -320,6 +320,42 @@ export function registerBlockchainTools(server: McpServer) {
 
 
 
+  server.tool(
+    "get_transaction_count",
+    "Get the transaction count (nonce) of an address. Use blockTag 'pending' to include transactions still in the mempool.",
+    {
+      address: z.string().describe("The account address to get the transaction count for"),
+      blockTag: z.enum(["latest", "pending"]).optional().describe("Count mined transactions only ('latest') or include pending ones ('pending'). Defaults to 'latest'."),
+      network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet.")
+    },
+    async ({ address, blockTag = "latest", network = "ethereum" }) => {
+      try {
+        const count = await services.getTransactionCount(address as Address, network, blockTag);
+        return {
+          content: [{
+            type: "text",
+            text: JSON.stringify({
+              network,
+              address,
+              blockTag,
+              transactionCount: count
+            }, null, 2)
+          }]
+        };
+      } catch (error) {
+        return {
+          content: [{
+            type: "text",
+            text: `Error fetching transaction count: ${error instanceof Error ? error.message : String(error)}`
+          }],
+          isError: true
+        };
+      }
+    }
+  );
+
+
+
   server.tool(
     "estimate_gas",
     "Estimate the gas cost for a transaction",
@@ -327,11 +363,15 @@ export function registerBlockchainTools(server: McpServer) {
       to: z.string().describe("The recipient address"),
       value: z.string().optional().describe("The amount of native token to send (e.g., '0.1' ETH)"),
       data: z.string().optional().describe("The transaction data as a hex string"),
+      from: z.string().optional().describe("The sending address. Set it so the estimate fails when the sender can't afford or execute the transaction."),
       network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet.")
     },
-    async ({ to, value, data, network = "ethereum" }) => {
+    async ({ to, value, data, from, network = "ethereum" }) => {
       try {
         const params: any = { to: to as Address };
+        if (from) {
+          params.account = from as Address;
+        }
         if (value) {
           params.value = services.helpers.parseEther(value);
         }
@@ -369,15 +409,17 @@ export function registerBlockchainTools(server: McpServer) {
       privateKey: z.string().optional().describe("Private key of the sender account in hex format (with or without 0x prefix). If not provided, reads from WALLET_PRIVATE_KEY environment variable. SECURITY: This is used only for transaction signing and is not stored."),
       to: z.string().describe("The recipient address or ENS name (e.g., '0x1234...' or 'example.eth')"),
       amount: z.string().describe("Amount to send in native token, as a string (e.g., '0.1')"),
-      network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet.")
+      network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet."),
+      nonce: z.number().optional().describe("Explicit transaction nonce. Omit to let the node assign the next one; set it when pipelining several transactions from the same account."),
+      gas: z.string().optional().describe("Gas limit, e.g. from estimate_gas with this sender as 'from'. Omit to have it estimated when sending."),
     },
-    async ({ privateKey, to, amount, network = "ethereum" }) => {
+    async ({ privateKey, to, amount, network = "ethereum", nonce, gas }) => {
       try {
         const key = privateKey || process.env.WALLET_PRIVATE_KEY;
         if (!key) {
           throw new Error("Private key not provided and WALLET_PRIVATE_KEY environment variable not set");
         }
-        const txHash = await services.transferNative(key, to, amount, network);
+        const txHash = await services.transferNative(key, to, amount, network, nonce, gas ? BigInt(gas) : undefined);
         return {
           content: [{
             type: "text",
@@ -386,7 +428,8 @@ export function registerBlockchainTools(server: McpServer) {
               txHash,
               to,
               amount,
-              network
+              network,
+              nonce
             })
           }]
         };
@@ -412,9 +455,11 @@ export function registerBlockchainTools(server: McpServer) {
       tokenAddress: z.string().describe("The address of the ERC20 token contract"),
       toAddress: z.string().describe("The recipient address"),
       amount: z.string().describe("The amount of tokens to send (in token units, e.g., '10' for 10 tokens)"),
-      network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet.")
+      network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet."),
+      nonce: z.number().optional().describe("Explicit transaction nonce. Omit to let the node assign the next one; set it when pipelining several transactions from the same account."),
+      gas: z.string().optional().describe("Gas limit, e.g. from estimate_gas with this sender as 'from'. Omit to have it estimated when sending."),
     },
-    async ({ privateKey, tokenAddress, toAddress, amount, network = "ethereum" }) => {
+    async ({ privateKey, tokenAddress, toAddress, amount, network = "ethereum", nonce, gas }) => {
       try {
         const key = privateKey || process.env.WALLET_PRIVATE_KEY;
         if (!key) {
@@ -428,7 +473,9 @@ export function registerBlockchainTools(server: McpServer) {
           toAddress as Address, 
           amount,
           formattedKey,
-          network
+          network,
+          nonce,
+          gas ? BigInt(gas) : undefined
         );
         return {
           content: [{
@@ -437,6 +484,7 @@ export function registerBlockchainTools(server: McpServer) {
               success: true,
               txHash: result.txHash,
               network,
+              nonce,
               tokenAddress,
               recipient: toAddress,
               amount: result.amount.formatted,
@@ -466,9 +514,11 @@ export function registerBlockchainTools(server: McpServer) {
       tokenAddress: z.string().describe("The contract address of the ERC20 token to approve for spending"),
       spenderAddress: z.string().describe("The contract address being approved to spend your tokens (e.g., a DEX or lending protocol)"),
       amount: z.string().describe("The amount of tokens to approve in token units, not wei (e.g., '1000' to approve spending 1000 tokens). Use a very large number for unlimited approval."),
-      network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet.")
+      network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet."),
+      nonce: z.number().optional().describe("Explicit transaction nonce. Omit to let the node assign the next one; set it when pipelining several transactions from the same account."),
+      gas: z.string().optional().describe("Gas limit, e.g. from estimate_gas with this sender as 'from'. Omit to have it estimated when sending."),
     },
-    async ({ privateKey, tokenAddress, spenderAddress, amount, network = "ethereum" }) => {
+    async ({ privateKey, tokenAddress, spenderAddress, amount, network = "ethereum", nonce, gas }) => {
       try {
         const formattedKey = privateKey.startsWith('0x') 
           ? privateKey as `0x${string}` 
@@ -478,7 +528,9 @@ export function registerBlockchainTools(server: McpServer) {
           spenderAddress as Address, 
           amount,
           formattedKey,
-          network
+          network,
+          nonce,
+          gas ? BigInt(gas) : undefined
         );
         return {
           content: [{
@@ -487,6 +539,7 @@ export function registerBlockchainTools(server: McpServer) {
               success: true,
               txHash: result.txHash,
               network,
+              nonce,
               tokenAddress,
               spender: spenderAddress,
               amount: result.amount.formatted,
@@ -604,9 +657,10 @@ export function registerBlockchainTools(server: McpServer) {
       functionName: z.string().describe("The name of the function to call on the contract (e.g., 'transfer')"),
       args: z.array(z.any()).describe("The arguments to pass to the function, as an array (e.g., ['0x1234...', '1000000000000000000'])"),
       privateKey: z.string().describe("Private key of the sending account in hex format (with or without 0x prefix). SECURITY: This is used only for transaction signing and is not stored."),
-      network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet.")
+      network: z.string().optional().describe("Network name (ethereum, sepolia) or chain ID. Defaults to Ethereum mainnet."),
+      nonce: z.number().optional().describe("Explicit transaction nonce. Omit to let the node assign the next one; set it when pipelining several transactions from the same account."),
     },
-    async ({ contractAddress, abi, functionName, args, privateKey, network = "ethereum" }) => {
+    async ({ contractAddress, abi, functionName, args, privateKey, network = "ethereum", nonce }) => {
       try {
         const parsedAbi = typeof abi === 'string' ? JSON.parse(abi) : abi;
         const contractParams: Record<string, any> = {
@@ -615,6 +669,9 @@ export function registerBlockchainTools(server: McpServer) {
           functionName,
           args
         };
+        if (nonce !== undefined) {
+          contractParams.nonce = nonce;
+        }
         const txHash = await services.writeContract(
           privateKey as Hex, 
           contractParams, 
@@ -626,6 +683,7 @@ export function registerBlockchainTools(server: McpServer) {
             text: services.helpers.formatJson({
               network,
               transactionHash: txHash,
+              nonce,
               message: "Contract write transaction sent successfully"
             })
           }]
@@ -0,0 +1,148 @@
+import json
+
+from agent.compaction import (
+    MAX_LIST_ITEMS,
+    MAX_TEXT_LENGTH,
+    PayloadStore,
+    cap_list,
+    compact_tool_result,
+    compact_value,
+    get_full_payload,
+    parse_tool_payload,
+    shorten_hash,
+    wei_to_ether,
+    wei_to_gwei,
+)
+
+ADDRESS = "0x" + "12" * 20
+TX_HASH = "0x" + "ab" * 32
+
+
+def mcp_result(payload, is_error=False):
+    result = {"content": [{"type": "text", "text": json.dumps(payload)}]}
+    if is_error:
+        result["isError"] = True
+    return result
+
+
+def test_shorten_hash_keeps_addresses_and_shortens_longer_hex():
+    assert shorten_hash(ADDRESS) == ADDRESS
+    assert shorten_hash(TX_HASH) == "0xabababab…abab"
+    assert shorten_hash("not hex " * 10) == "not hex " * 10
+    assert shorten_hash(42) == 42
+
+
+def test_wei_conversions_are_exact_and_leave_bad_input_alone():
+    assert wei_to_ether("1234500000000000000") == "1.2345"
+    assert wei_to_ether(10 ** 18) == "1"
+    assert wei_to_ether("1") == "0.000000000000000001"
+    assert wei_to_gwei("12000000000") == "12"
+    assert wei_to_gwei("1500000000") == "1.5"
+    assert wei_to_ether("pending") == "pending"
+    assert wei_to_gwei(None) is None
+
+
+def test_cap_list_keeps_the_first_items_and_the_total():
+    capped = cap_list(list(range(12)), lambda item: item * 2)
+    assert capped == {"count": 12, "items": [0, 2, 4, 6, 8], "truncated": True}
+    assert cap_list([1, 2]) == {"count": 2, "items": [1, 2], "truncated": False}
+
+
+def test_compact_value_recurses_into_nested_payloads():
+    compacted = compact_value({
+        "hashes": [TX_HASH] * 8,
+        "owner": ADDRESS,
+        "note": "x" * (MAX_TEXT_LENGTH + 10),
+        "short": [TX_HASH],
+    })
+    assert compacted["hashes"]["count"] == 8 and compacted["hashes"]["truncated"]
+    assert compacted["hashes"]["items"][0] == shorten_hash(TX_HASH)
+    assert compacted["owner"] == ADDRESS
+    assert compacted["note"].endswith("… [10 more chars]")
+    assert compacted["short"] == [shorten_hash(TX_HASH)]
+
+
+def test_block_projection():
+    block = {
+        "number": "21000000", "hash": TX_HASH, "parentHash": TX_HASH, "timestamp": "1730000000",
+        "miner": ADDRESS, "gasUsed": "14999999", "gasLimit": "30000000", "baseFeePerGas": "12000000000",
+        "logsBloom": "0x" + "0" * 512, "transactions": [TX_HASH] * 180,
+    }
+    data = compact_tool_result("get_latest_block", mcp_result(block))["data"]
+    assert data == {
+        "number": "21000000", "hash": shorten_hash(TX_HASH), "timestamp": "1730000000", "miner": ADDRESS,
+        "gasUsed": "14999999", "gasLimit": "30000000", "baseFeePerGasGwei": "12",
+        "transactions": {"count": 180, "items": [shorten_hash(TX_HASH)] * MAX_LIST_ITEMS, "truncated": True},
+    }
+
+
+def test_pending_block_has_no_hash_field():
+    data = compact_tool_result("get_block_by_number", mcp_result({"number": None, "hash": None, "transactions": []}))["data"]
+    assert "hash" not in data
+    assert data["transactions"] == {"count": 0, "items": [], "truncated": False}
+
+
+def test_transaction_projection():
+    tx = {
+        "hash": TX_HASH, "from": ADDRESS, "to": ADDRESS, "value": "250000000000000000", "gas": "60000",
+        "gasPrice": "15000000000", "maxFeePerGas": None, "nonce": 42, "blockNumber": "21000000",
+        "input": "0xa9059cbb" + "0" * 128, "r": "0x1", "s": "0x2",
+    }
+    data = compact_tool_result("get_transaction", mcp_result(tx))["data"]
+    assert data == {
+        "hash": TX_HASH, "from": ADDRESS, "to": ADDRESS, "nonce": 42, "blockNumber": "21000000", "gas": "60000",
+        "valueEth": "0.25", "gasPriceGwei": "15", "inputSelector": "0xa9059cbb", "inputBytes": 68,
+    }
+
+
+def test_receipt_projection():
+    receipt = {
+        "transactionHash": TX_HASH, "status": "success", "blockNumber": "21000000", "from": ADDRESS, "to": ADDRESS,
+        "gasUsed": "21000", "effectiveGasPrice": "20000000000", "logsBloom": "0x" + "0" * 512,
+        "logs": [{"address": ADDRESS, "topics": [TX_HASH, TX_HASH], "data": "0x" + "0" * 128}] * 7,
+    }
+    data = compact_tool_result("get_transaction_receipt", mcp_result(receipt))["data"]
+    assert data["effectiveGasPriceGwei"] == "20"
+    assert data["feeEth"] == "0.00042"
+    assert data["logs"]["count"] == 7
+    assert data["logs"]["items"][0] == {"address": ADDRESS, "topic0": shorten_hash(TX_HASH), "topics": 2}
+    assert "logsBloom" not in data
+
+
+def test_malformed_payload_falls_back_to_generic_compaction():
+    data = compact_tool_result("get_transaction_receipt", mcp_result({"gasUsed": "lots", "effectiveGasPrice": "1"}))["data"]
+    assert data == {"gasUsed": "lots", "effectiveGasPrice": "1"}
+
+
+def test_errors_are_flagged_and_unknown_tools_compacted_generically():
+    error = compact_tool_result("get_balance", {"content": [{"type": "text", "text": "Error fetching balance"}], "isError": True})
+    assert error["isError"] and error["data"] == "Error fetching balance"
+    ok = compact_tool_result("get_balance", mcp_result({"address": ADDRESS, "wei": "1"}))
+    assert "isError" not in ok and ok["data"] == {"address": ADDRESS, "wei": "1"}
+
+
+def test_parse_tool_payload_unwraps_the_envelope():
+    assert parse_tool_payload(mcp_result({"a": 1})) == {"a": 1}
+    assert parse_tool_payload({"content": [{"type": "text", "text": "plain"}]}) == "plain"
+    two = {"content": [{"type": "text", "text": "a"}, {"type": "text", "text": "b"}]}
+    assert parse_tool_payload(two) == ["a", "b"]
+    assert parse_tool_payload([1, 2]) == [1, 2]
+
+
+def test_full_payload_is_reachable_by_ref_and_path():
+    receipt = {"logs": [{"data": "0x01"}, {"data": "0x02"}], "status": "success"}
+    ref = compact_tool_result("get_transaction_receipt", mcp_result(receipt))["ref"]
+    assert get_full_payload(ref) == {"success": True, "data": receipt}
+    assert get_full_payload(ref, "logs.1.data") == {"success": True, "data": "0x02"}
+    assert not get_full_payload(ref, "logs.9.data")["success"]
+    assert not get_full_payload(ref, "status.code")["success"]
+    assert not get_full_payload("mcp:missing")["success"]
+
+
+def test_payload_store_evicts_least_recently_used():
+    store = PayloadStore(max_entries=2)
+    first, second = store.put("a"), store.put("b")
+    assert store.get(first) == "a"
+    store.put("c")
+    assert store.get(second) is None
+    assert store.get(first) == "a"
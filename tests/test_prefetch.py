@@ -0,0 +1,126 @@
+import threading
+import time
+
+from agent import prefetch
+from agent.prefetch import Prefetcher, extract_entities
+
+WALLET = "0x" + "12" * 20
+TX_HASH = "0x" + "ab" * 32
+
+
+class StubFetch:
+    """Answers speculative MCP calls; is_contract says every address is a wallet"""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, tool, arguments):
+        self.gate.wait(5)
+        self.calls.append(tool)
+        if tool == "is_contract":
+            return {"success": True, "data": {"isContract": False}}
+        return {"success": True, "data": {"tool": tool, **arguments}}
+
+
+def wait_for(prefetcher, tool, timeout=5.0):
+    # Follow-ups are scheduled from done callbacks, so poll until the entry shows up and completes
+    for _ in range(int(timeout / 0.001)):
+        with prefetcher._lock:
+            future = next((entry["future"] for key, entry in prefetcher._entries.items() if key[0] == tool), None)
+        if future is not None:
+            future.exception(timeout=timeout)
+            return
+        time.sleep(0.001)
+    raise AssertionError(f"{tool} was never prefetched")
+
+
+def test_entities_come_from_addresses_and_hashes_without_overlap():
+    entities = extract_entities(f"check {WALLET} and {TX_HASH}")
+    assert entities == {"addresses": [WALLET], "tx_hashes": [TX_HASH]}
+
+
+def test_turn_claims_its_lookups_and_follow_ups():
+    stub = StubFetch()
+    prefetcher = Prefetcher(stub, ttl=30)
+    try:
+        turn = prefetcher.start(f"balance of {WALLET}")
+        wait_for(prefetcher, "get_balance")
+        assert prefetcher.take("get_balance", {"address": WALLET, "network": "sepolia"})["success"]
+        # Each turn claims a result once; a repeat call goes to the server
+        assert prefetcher.take("get_balance", {"address": WALLET, "network": "sepolia"}) is None
+        prefetcher.finish(turn)
+    finally:
+        prefetcher.shutdown()
+    assert stub.calls == ["is_contract", "get_balance"]
+
+
+def test_requests_naming_the_same_address_share_one_lookup():
+    stub = StubFetch()
+    prefetcher = Prefetcher(stub, ttl=30)
+    try:
+        first = prefetcher.start(f"balance of {WALLET}")
+        second = prefetcher.start(f"is {WALLET} a contract?")
+        wait_for(prefetcher, "get_balance")
+        # The first request finishing must not cancel what the second still expects
+        prefetcher.finish(first)
+        assert prefetcher.take("is_contract", {"address": WALLET, "network": "sepolia"})["success"]
+        assert prefetcher.take("get_balance", {"address": WALLET, "network": "sepolia"})["success"]
+        prefetcher.finish(second)
+        assert prefetcher._entries == {}
+    finally:
+        prefetcher.shutdown()
+    assert stub.calls == ["is_contract", "get_balance"]
+
+
+def test_last_owner_finishing_cancels_unclaimed_lookups():
+    stub = StubFetch()
+    stub.gate.clear()
+    prefetcher = Prefetcher(stub, max_workers=1, ttl=30)
+    try:
+        first = prefetcher.start(f"receipt {TX_HASH} and {WALLET}")
+        second = prefetcher.start(f"receipt {TX_HASH}")
+        prefetcher.finish(first)
+        assert set(prefetcher._entries) == {("get_transaction_receipt", f'{{"hash": "{TX_HASH}", "network": "sepolia"}}')}
+        prefetcher.finish(second)
+        assert prefetcher._entries == {}
+        assert prefetcher._active == {}
+    finally:
+        stub.gate.set()
+        prefetcher.shutdown()
+
+
+def test_follow_ups_are_not_scheduled_for_finished_turns():
+    stub = StubFetch()
+    stub.gate.clear()
+    prefetcher = Prefetcher(stub, max_workers=1, ttl=30)
+    try:
+        turn = prefetcher.start(f"balance of {WALLET}")
+        with prefetcher._lock:
+            lookup = next(iter(prefetcher._entries.values()))["future"]
+        # is_contract is already running, so finishing the turn can't cancel it
+        prefetcher.finish(turn)
+        stub.gate.set()
+        lookup.result(timeout=5)
+        prefetcher._executor.submit(lambda: None).result(timeout=5)
+    finally:
+        prefetcher.shutdown()
+    assert stub.calls == ["is_contract"]
+
+
+def test_turns_that_never_finish_are_dropped_after_the_ttl(monkeypatch):
+    stub = StubFetch()
+    clock = [100.0]
+    monkeypatch.setattr(prefetch.time, "monotonic", lambda: clock[0])
+    prefetcher = Prefetcher(stub, ttl=30)
+    try:
+        leaked = prefetcher.start(f"balance of {WALLET}")
+        wait_for(prefetcher, "get_balance")
+        clock[0] += 31
+        current = prefetcher.start("what is trending?")
+        assert set(prefetcher._active) == {current}
+        assert leaked not in prefetcher._active
+        assert prefetcher._entries == {}
+    finally:
+        prefetcher.shutdown()
@@ -0,0 +1,238 @@
+import json
+import time
+
+from agent import transactions
+from agent.transactions import NonceTracker, TransactionPipeline
+
+real_sleep = time.sleep
+
+SENDER = "0x00000000000000000000000000000000000000aa"
+
+
+def mcp_result(payload, is_error=False):
+    text = payload if isinstance(payload, str) else json.dumps(payload)
+    result = {"content": [{"type": "text", "text": text}]}
+    if is_error:
+        result["isError"] = True
+    return {"success": True, "data": result}
+
+
+class StubMCP:
+    """Stands in for ethereum_mcp_call(..., compact=False) with a scripted chain"""
+
+    def __init__(self, chain_nonce=5, failures=None, receipt_after=0):
+        self.chain_nonce = chain_nonce
+        # recipient -> error text returned (once) when sending to it
+        self.failures = dict(failures or {})
+        self.receipt_after = receipt_after
+        self.calls = []
+        self.sent_nonces = []
+        self.on_send = None
+
+    def __call__(self, name, arguments):
+        self.calls.append((name, arguments))
+        if name == "get_address_from_private_key":
+            return mcp_result({"address": SENDER})
+        if name == "get_transaction_count":
+            return mcp_result({"address": arguments["address"], "transactionCount": str(self.chain_nonce)})
+        if name == "estimate_gas":
+            error = self.failures.get(arguments["to"]) if arguments["to"].startswith("0x") else None
+            if error:
+                return mcp_result(f"Error estimating gas: {error}", is_error=True)
+            return mcp_result({"estimatedGas": "21000" if "data" not in arguments else "51000"})
+        if name == "get_token_info":
+            return mcp_result({"address": arguments["tokenAddress"], "symbol": "PUP", "decimals": 6})
+        if name in ("transfer_native", "transfer_erc20"):
+            error = self.failures.pop(arguments.get("to", arguments.get("toAddress")), None)
+            if error:
+                return mcp_result(error, is_error=True)
+            self.sent_nonces.append(arguments["nonce"])
+            if self.on_send:
+                self.on_send(arguments["nonce"])
+            return mcp_result({"txHash": f"0x{arguments['nonce']:064x}"})
+        if name == "get_transaction_receipt":
+            polls = sum(1 for called, _ in self.calls if called == name)
+            if polls <= self.receipt_after:
+                return mcp_result("Transaction receipt not found", is_error=True)
+            return mcp_result({"transactionHash": arguments["hash"], "status": "success", "blockNumber": "100"})
+        raise AssertionError(f"unexpected tool {name}")
+
+
+def transfers(*recipients):
+    return [("transfer_native", {"to": to, "amount": "0.1"}) for to in recipients]
+
+
+def test_nonces_start_at_pending_count_and_go_out_in_order():
+    stub = StubMCP(chain_nonce=5)
+    pipeline = TransactionPipeline(stub)
+    try:
+        results = pipeline.submit_batch(transfers("a", "b", "c"), "key", "sepolia")
+    finally:
+        pipeline.shutdown()
+
+    assert [r["nonce"] for r in results] == [5, 6, 7]
+    assert stub.sent_nonces == [5, 6, 7]
+    assert all(r["success"] and r["status"] == "pending" for r in results)
+    # The chain is read once; later nonces are served locally
+    assert sum(1 for name, _ in stub.calls if name == "get_transaction_count") == 1
+
+
+def test_failed_send_releases_its_nonce_to_the_next_transaction():
+    stub = StubMCP(chain_nonce=5, failures={"bad": "insufficient funds for gas * price + value"})
+    pipeline = TransactionPipeline(stub)
+    try:
+        results = pipeline.submit_batch(transfers("a", "bad", "b", "c"), "key", "sepolia")
+    finally:
+        pipeline.shutdown()
+
+    assert not results[1]["success"]
+    assert [r["nonce"] for r in results] == [5, 6, 6, 7]
+    assert stub.sent_nonces == [5, 6, 7]
+    assert pipeline.nonces.lowest_released(SENDER, "sepolia") is None
+
+
+def test_nonce_too_low_resyncs_from_the_chain():
+    stub = StubMCP(chain_nonce=5, failures={"a": "nonce too low: next nonce 9, tx nonce 5"})
+    pipeline = TransactionPipeline(stub)
+    try:
+        first = pipeline.submit(*transfers("a")[0], "key", "sepolia")
+        stub.chain_nonce = 9
+        second = pipeline.submit(*transfers("b")[0], "key", "sepolia")
+    finally:
+        pipeline.shutdown()
+
+    assert not first["success"]
+    assert second["success"] and second["nonce"] == 9
+    assert sum(1 for name, _ in stub.calls if name == "get_transaction_count") == 2
+
+
+def test_transactions_above_an_unused_nonce_are_reported_blocked():
+    stub = StubMCP(chain_nonce=5)
+    pipeline = TransactionPipeline(stub)
+    # A concurrent batch holds nonce 5 and hands it back after our send went out
+    held = pipeline.nonces.reserve(SENDER, "sepolia")
+    stub.on_send = lambda nonce: pipeline.nonces.release(SENDER, "sepolia", held)
+    try:
+        results = pipeline.submit_batch(transfers("a"), "key", "sepolia", wait_for_receipts=True)
+    finally:
+        pipeline.shutdown()
+
+    assert held == 5
+    assert stub.sent_nonces == [6]
+    assert results[0]["status"] == "blocked" and not results[0]["success"]
+    assert results[0]["blockedByNonce"] == 5
+    # A blocked transaction can't be mined yet, so no receipt is polled for it
+    assert "receipt" not in results[0]
+    assert not any(name == "get_transaction_receipt" for name, _ in stub.calls)
+
+
+def test_receipt_polling_backs_off_exponentially(monkeypatch):
+    stub = StubMCP(receipt_after=4)
+    sleeps = []
+    monkeypatch.setattr(transactions.time, "sleep", sleeps.append)
+    pipeline = TransactionPipeline(stub, poll_interval=1.0, max_poll_interval=4.0)
+    try:
+        receipt = pipeline.wait_for_receipt("0x" + "ab" * 32, "sepolia", timeout=60).result()
+    finally:
+        pipeline.shutdown()
+
+    assert receipt["success"] and receipt["status"] == "success"
+    assert sleeps == [1.0, 2.0, 4.0, 4.0]
+
+
+def test_receipt_polling_gives_up_at_the_timeout(monkeypatch):
+    stub = StubMCP(receipt_after=1000)
+    clock = [0.0]
+    monkeypatch.setattr(transactions.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(transactions.time, "sleep", lambda seconds: clock.__setitem__(0, clock[0] + seconds))
+    pipeline = TransactionPipeline(stub, poll_interval=1.0, max_poll_interval=8.0)
+    try:
+        receipt = pipeline._poll_receipt("0x" + "ab" * 32, "sepolia", timeout=10)
+    finally:
+        pipeline.shutdown()
+
+    assert not receipt["success"]
+    assert "Timed out" in receipt["error"]
+
+
+def test_released_nonces_are_reused_lowest_first():
+    tracker = NonceTracker(lambda address, network: 10)
+    assert [tracker.reserve(SENDER, "sepolia") for _ in range(4)] == [10, 11, 12, 13]
+    tracker.release(SENDER, "sepolia", 12)
+    tracker.release(SENDER, "sepolia", 11)
+    assert tracker.lowest_released(SENDER, "sepolia") == 11
+    assert [tracker.reserve(SENDER, "sepolia") for _ in range(3)] == [11, 12, 14]
+
+
+def test_pending_receipt_polls_do_not_hold_up_sends(monkeypatch):
+    stub = StubMCP(receipt_after=1000)
+    monkeypatch.setattr(transactions.time, "sleep", lambda seconds: real_sleep(0.05))
+    pipeline = TransactionPipeline(stub, max_workers=2, receipt_timeout=1.0)
+    try:
+        polls = [pipeline.wait_for_receipt("0x" + f"{i:064x}", "sepolia") for i in range(2)]
+        started = time.monotonic()
+        result = pipeline.submit(*transfers("a")[0], "key", "sepolia")
+        elapsed = time.monotonic() - started
+        assert not any(poll.done() for poll in polls)
+    finally:
+        pipeline.shutdown(wait=False)
+
+    assert result["success"]
+    assert elapsed < 0.5
+
+
+def test_estimates_run_as_the_sender_and_become_the_gas_limit():
+    stub = StubMCP()
+    recipient = "0x" + "22" * 20
+    pipeline = TransactionPipeline(stub)
+    try:
+        result = pipeline.submit("transfer_native", {"to": recipient, "amount": "0.1"}, "key", "sepolia")
+    finally:
+        pipeline.shutdown()
+
+    estimate = next(arguments for name, arguments in stub.calls if name == "estimate_gas")
+    assert estimate == {"from": SENDER, "network": "sepolia", "to": recipient, "value": "0.1"}
+    send = next(arguments for name, arguments in stub.calls if name == "transfer_native")
+    assert send["gas"] == "21000"
+    assert result["estimatedGas"] == "21000"
+
+
+def test_erc20_transfers_are_estimated_with_encoded_calldata():
+    stub = StubMCP()
+    token, recipient = "0x" + "33" * 20, "0x" + "44" * 20
+    pipeline = TransactionPipeline(stub)
+    try:
+        results = pipeline.submit_batch([
+            ("transfer_erc20", {"tokenAddress": token, "toAddress": recipient, "amount": "1.5"}),
+            ("transfer_erc20", {"tokenAddress": token, "toAddress": recipient, "amount": "2"}),
+        ], "key", "sepolia")
+    finally:
+        pipeline.shutdown()
+
+    estimates = [arguments for name, arguments in stub.calls if name == "estimate_gas"]
+    padded_recipient = "0" * 24 + "44" * 20
+    # 1.5 and 2 tokens at 6 decimals
+    assert sorted(e["data"] for e in estimates) == [
+        "0xa9059cbb" + padded_recipient + "16e360".rjust(64, "0"),
+        "0xa9059cbb" + padded_recipient + "1e8480".rjust(64, "0"),
+    ]
+    assert all(e["to"] == token and e["from"] == SENDER for e in estimates)
+    # Token decimals are read once per token
+    assert sum(1 for name, _ in stub.calls if name == "get_token_info") == 1
+    assert all(r["success"] and r["data"] for r in results)
+    assert [a["gas"] for name, a in stub.calls if name == "transfer_erc20"] == ["51000", "51000"]
+
+
+def test_failed_estimate_skips_the_send_without_using_a_nonce():
+    bad = "0x" + "55" * 20
+    stub = StubMCP(chain_nonce=5, failures={bad: "insufficient funds for gas * price + value"})
+    pipeline = TransactionPipeline(stub)
+    try:
+        results = pipeline.submit_batch(transfers(bad, "0x" + "66" * 20), "key", "sepolia")
+    finally:
+        pipeline.shutdown()
+
+    assert not results[0]["success"] and "insufficient funds" in results[0]["error"]
+    assert "nonce" not in results[0]
+    assert results[1]["nonce"] == 5
+    assert stub.sent_nonces == [5]